@@ -1,11 +1,17 @@
 from fastapi import APIRouter
 from app.api.search import router as search_router
 from app.api.cache import router as cache_router
+from app.api.admission import router as admission_router
+from app.api.typeahead import router as typeahead_router
+from app.api.query_log import router as query_log_router
 
 api_router = APIRouter()
 
 api_router.include_router(search_router, prefix="/search", tags=["search"])
 api_router.include_router(cache_router, prefix="/cache", tags=["cache"])
+api_router.include_router(admission_router, prefix="/admission", tags=["admission"])
+api_router.include_router(typeahead_router, prefix="/typeahead", tags=["typeahead"])
+api_router.include_router(query_log_router, prefix="/query-log", tags=["query-log"])
 
 # 添加更多路由器
 # api_router.include_router(other_router, prefix="/other", tags=["other"]) 
\ No newline at end of file
@@ -0,0 +1,19 @@
+from fastapi import APIRouter
+from typing import Dict, Any
+
+from app.services.admission_service import admission_controller
+from app.core.config import settings
+
+router = APIRouter()
+
+
+@router.get("/stats")
+async def get_admission_stats() -> Dict[str, Any]:
+    """获取准入控制统计信息(并发数、队列深度、拒绝次数)"""
+    if not settings.ADMISSION_ENABLED:
+        return {"status": "disabled", "message": "准入控制已禁用"}
+    
+    return {
+        "status": "enabled",
+        "stats": admission_controller.stats
+    }
@@ -0,0 +1,30 @@
+from fastapi import APIRouter
+from typing import Dict, Any
+
+from app.services.query_log_service import query_log_service
+from app.core.config import settings
+
+router = APIRouter()
+
+
+@router.get("/stats")
+async def get_query_log_stats() -> Dict[str, Any]:
+    """获取查询日志统计信息"""
+    if not settings.QUERY_LOG_ENABLED:
+        return {"status": "disabled", "message": "查询日志已禁用"}
+    
+    return {
+        "status": "enabled",
+        "stats": query_log_service.stats
+    }
+
+
+@router.post("/flush")
+async def flush_query_log() -> Dict[str, Any]:
+    """立即将队列中的查询日志写入文件"""
+    written = await query_log_service.flush()
+    return {
+        "status": "success",
+        "message": f"已写入 {written} 条查询日志",
+        "written_count": written
+    }
@@ -1,5 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from typing import Dict, List, Optional
+import time
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from typing import Any, Dict, List, Optional
 
 from app.schemas.search import (
     SearchRequest, 
@@ -11,6 +12,11 @@ from app.schemas.search import (
 from app.services.search_service import search_service
 from app.services.search_engines import SearchResult
 from app.services.cache_service import cache_service
+from app.services.admission_service import admission_controller, AdmissionRejected
+from app.services.typeahead_service import typeahead_service
+from app.services.routing_service import engine_router
+from app.services.query_log_service import query_log_service, REPLAY_HEADER
+from app.services.merge_service import merge_results, previous_page_ids, project_fields
 from app.core.config import settings
 
 router = APIRouter()
@@ -18,19 +24,18 @@ router = APIRouter()
 
 @router.get("/engines", response_model=AvailableEnginesResponse)
 async def get_available_engines():
-    """获取所有可用的搜索引擎"""
+    """获取所有已注册的搜索引擎及其可用状态，尚未加载的引擎会在此时加载"""
     engines = []
-    available = search_service.available_engines
     
     engine_descriptions = {
         "google": "Google自定义搜索引擎"
         # 添加其他引擎的描述
     }
     
-    for engine_name in available:
+    for engine_name in search_service.registered_engines:
         engines.append(EngineInfo(
             name=engine_name,
-            is_available=True,
+            is_available=search_service.get_engine(engine_name) is not None,
             description=engine_descriptions.get(engine_name)
         ))
     
@@ -40,98 +45,232 @@ async def get_available_engines():
     )
 
 
+@router.post("/engines/reload")
+async def reload_engines() -> Dict[str, Any]:
+    """重新加载搜索引擎配置，新增、移除或更新引擎而无需重启服务"""
+    try:
+        changes = search_service.reload_engines()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "status": "success",
+        "changes": changes,
+        "engines": search_service.available_engines
+    }
+
+
+@router.get("/engines/profiles")
+async def get_engine_profiles() -> Dict[str, Any]:
+    """获取各搜索引擎的延迟、错误率和成本画像"""
+    return {"profiles": engine_router.stats}
+
+
+def _cache_outcome(search_response: Optional[SearchResponse]) -> Optional[str]:
+    """根据响应的缓存信息判断缓存结果: disabled, stale, hit, partial 或 miss"""
+    if search_response is None:
+        return None
+    cache_info = search_response.cache_info
+    if not cache_info.get("enabled"):
+        return "disabled"
+    if cache_info.get("stale"):
+        return "stale"
+    cache_result_count = cache_info.get("cache_result_count", 0)
+    if cache_result_count == 0:
+        return "miss"
+    return "hit" if cache_result_count >= search_response.total_results else "partial"
+
+
 @router.post("/search", response_model=SearchResponse)
-async def search(request: SearchRequest):
+async def search(
+    request: SearchRequest,
+    response: Response,
+    replay: Optional[str] = Header(None, alias=REPLAY_HEADER, description="回放工具发送的请求，不记录查询日志")
+):
+    """执行搜索查询，并记录查询日志"""
+    start_time = time.perf_counter()
+    status_code = 200
+    search_response = None
+    try:
+        search_response = await _execute_search(request, response)
+        return search_response
+    except HTTPException as e:
+        status_code = e.status_code
+        raise
+    except Exception:
+        status_code = 500
+        raise
+    finally:
+        # 仅放入内存队列，由后台任务写入文件；回放请求不记录，避免日志随每次回放增长
+        if not replay:
+            query_log_service.log({
+                "query": request.query,
+                "engine": request.engine,
+                "num_results": request.num_results,
+                "start_index": request.start_index,
+                "use_cache": request.use_cache,
+                "routing": request.routing,
+                "merge": request.merge,
+                "status": status_code,
+                "latency_ms": round((time.perf_counter() - start_time) * 1000, 2),
+                "cache": _cache_outcome(search_response),
+                "total_results": search_response.total_results if search_response else 0,
+                "engines_used": search_response.engines_used if search_response else []
+            })
+
+
+async def _execute_search(request: SearchRequest, response: Response) -> SearchResponse:
     """执行搜索查询"""
     if not request.query.strip():
         raise HTTPException(status_code=400, detail="搜索查询不能为空")
+    if request.fields and not request.merge:
+        raise HTTPException(status_code=400, detail="fields 仅在合并模式(merge=true)下可用")
     
-    # 读取请求中的缓存设置
-    original_cache_setting = settings.CACHE_ENABLED
-    if settings.CACHE_ENABLED and not request.use_cache:
-        # 临时禁用缓存
-        settings.CACHE_ENABLED = False
-    
-    cache_used = settings.CACHE_ENABLED
+    # 读取请求中的缓存设置，逐请求传递而不修改全局配置，避免影响并发请求
+    cache_used = settings.CACHE_ENABLED and request.use_cache
     
     # 记录缓存统计前的状态
     cache_hits_before = cache_service.stats["hits"] if cache_used else 0
     
-    # 执行搜索
+    # 执行搜索(受准入控制保护)
+    degraded = False
+    served_from_cache = False
+    routing_decisions = None
     try:
-        search_results = await search_service.search(
-            query=request.query,
-            engine_name=request.engine,
-            num=request.num_results,
-            start=request.start_index
-        )
+        async with admission_controller.slot():
+            if request.routing and not request.engine:
+                search_results, routing_decisions = await search_service.search_routed(
+                    query=request.query,
+                    use_cache=cache_used,
+                    num=request.num_results,
+                    start=request.start_index
+                )
+            else:
+                search_results = await search_service.search(
+                    query=request.query,
+                    engine_name=request.engine,
+                    use_cache=cache_used,
+                    num=request.num_results,
+                    start=request.start_index
+                )
+    except AdmissionRejected as e:
+        # 服务过载时尝试返回缓存结果，只有确实已过期的结果才作为降级响应
+        fallback = None
+        if settings.ADMISSION_STALE_FALLBACK:
+            fallback = search_service.get_stale_results(
+                query=request.query,
+                engine_name=request.engine,
+                use_cache=cache_used,
+                num=request.num_results,
+                start=request.start_index
+            )
+        if fallback is None:
+            raise HTTPException(
+                status_code=503,
+                detail=str(e),
+                headers={"Retry-After": str(e.retry_after)}
+            )
+        search_results, stale = fallback
+        served_from_cache = True
+        if stale:
+            admission_controller.record_stale_served()
+            degraded = True
+            response.headers["Warning"] = '110 - "Response is Stale"'
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"搜索执行失败: {str(e)}")
-    finally:
-        # 恢复原始缓存设置
-        settings.CACHE_ENABLED = original_cache_setting
+    
+    # 记录查询供输入联想使用，只记录会写入缓存的第一页、全部引擎、非路由搜索
+    if cache_used and not degraded and request.start_index == 1 and not request.engine and not request.routing:
+        typeahead_service.record(request.query, request.num_results)
     
     # 获取缓存命中信息
     cache_hits_after = cache_service.stats["hits"] if cache_used else 0
-    cache_hit = cache_hits_after > cache_hits_before
+    cache_hit = cache_hits_after > cache_hits_before or served_from_cache
     
     # 格式化结果
     formatted_results: Dict[str, List[SearchResultItem]] = {}
+    merged_results = None
     total_count = 0
     cache_result_count = 0
     
-    for engine_name, results in search_results.items():
-        formatted_results[engine_name] = []
-        for result in results:
-            if result.is_from_cache:
-                cache_result_count += 1
-                
-            formatted_results[engine_name].append(
-                SearchResultItem(
-                    title=result.title,
-                    link=result.link,
-                    snippet=result.snippet,
-                    source=result.source,
-                    position=result.position,
-                    additional_info=result.additional_info,
-                    is_from_cache=result.is_from_cache
+    if request.merge:
+        # 合并模式：跨引擎和跨页去重，只返回一个精简列表
+        exclude_ids = previous_page_ids(
+            request.query,
+            list(search_results.keys()),
+            request.num_results,
+            request.start_index
+        )
+        merged = merge_results(search_results, exclude_ids)
+        cache_result_count = sum(1 for item in merged if item["is_from_cache"])
+        total_count = len(merged)
+        merged_results = project_fields(merged, request.fields)
+    else:
+        for engine_name, results in search_results.items():
+            formatted_results[engine_name] = []
+            for result in results:
+                if result.is_from_cache:
+                    cache_result_count += 1
+                    
+                formatted_results[engine_name].append(
+                    SearchResultItem(
+                        title=result.title,
+                        link=result.link,
+                        snippet=result.snippet,
+                        source=result.source,
+                        position=result.position,
+                        additional_info=result.additional_info,
+                        is_from_cache=result.is_from_cache
+                    )
                 )
-            )
-        total_count += len(results)
+            total_count += len(results)
     
     # 准备缓存信息
     cache_info = {
         "enabled": cache_used,
         "used": cache_hit,
         "cache_result_count": cache_result_count,
-        "cache_result_percentage": f"{(cache_result_count / total_count * 100) if total_count > 0 else 0:.2f}%"
+        "cache_result_percentage": f"{(cache_result_count / total_count * 100) if total_count > 0 else 0:.2f}%",
+        "stale": degraded
+    }
+    
+    metadata = {
+        "request_params": {
+            "num_results": request.num_results,
+            "start_index": request.start_index,
+            "use_cache": request.use_cache,
+            "routing": request.routing,
+            "merge": request.merge
+        },
+        "degraded": degraded
     }
+    if routing_decisions is not None:
+        metadata["routing_decisions"] = routing_decisions
     
     return SearchResponse(
         query=request.query,
         engines_used=list(search_results.keys()),
         total_results=total_count,
         results=formatted_results,
-        metadata={
-            "request_params": {
-                "num_results": request.num_results,
-                "start_index": request.start_index,
-                "use_cache": request.use_cache
-            }
-        },
+        merged_results=merged_results,
+        metadata=metadata,
         cache_info=cache_info
     )
 
 
 @router.get("/search", response_model=SearchResponse)
 async def search_get(
+    response: Response,
     query: str = Query(..., description="搜索查询关键词"),
     engine: Optional[str] = Query(None, description="指定搜索引擎(可选)"),
     num_results: Optional[int] = Query(10, ge=1, le=50, description="返回结果数量"),
     start_index: Optional[int] = Query(1, ge=1, description="结果起始索引"),
-    use_cache: bool = Query(True, description="是否使用缓存")
+    use_cache: bool = Query(True, description="是否使用缓存"),
+    routing: bool = Query(False, description="是否按延迟、错误率和成本智能选择引擎"),
+    merge: bool = Query(False, description="是否合并各引擎结果为去重后的单一列表"),
+    fields: Optional[str] = Query(None, description="合并模式下需要保留的结果字段，逗号分隔，以 - 开头表示排除"),
+    replay: Optional[str] = Header(None, alias=REPLAY_HEADER, description="回放工具发送的请求，不记录查询日志")
 ):
     """通过GET请求执行搜索查询"""
     request = SearchRequest(
@@ -139,6 +278,9 @@ async def search_get(
         engine=engine,
         num_results=num_results,
         start_index=start_index,
-        use_cache=use_cache
+        use_cache=use_cache,
+        routing=routing,
+        merge=merge,
+        fields=[field for field in fields.split(",") if field.strip()] if fields else None
     )
-    return await search(request) 
\ No newline at end of file
+    return await search(request, response, replay) 
\ No newline at end of file
@@ -0,0 +1,136 @@
+import asyncio
+import json
+import logging
+from fastapi import APIRouter, HTTPException, Query, WebSocket, WebSocketDisconnect
+from typing import Dict, Any, List, Optional
+
+from app.schemas.search import SearchResultItem, TypeaheadResponse
+from app.services.typeahead_service import typeahead_service, TypeaheadSession
+
+router = APIRouter()
+logger = logging.getLogger("web-search-api")
+
+
+def _build_response(suggestion: Optional[Dict[str, Any]], query: str) -> TypeaheadResponse:
+    """将联想结果转换为响应模型，None 表示请求已被取代"""
+    if suggestion is None:
+        return TypeaheadResponse(query=query, superseded=True)
+
+    results: Dict[str, List[SearchResultItem]] = {}
+    for engine_name, engine_results in suggestion["results"].items():
+        results[engine_name] = [
+            SearchResultItem(**result.to_dict()) for result in engine_results
+        ]
+
+    return TypeaheadResponse(
+        query=suggestion["query"],
+        suggestions=suggestion["suggestions"],
+        results=results,
+        source=suggestion["source"]
+    )
+
+
+@router.get("/suggest", response_model=TypeaheadResponse)
+async def suggest(
+    q: str = Query(..., description="当前输入的查询"),
+    session_id: Optional[str] = Query(None, description="会话ID，提供时对输入防抖并取消同一会话中被取代的请求"),
+    engine: Optional[str] = Query(None, description="指定搜索引擎(可选)"),
+    limit: Optional[int] = Query(None, ge=1, le=50, description="返回的联想查询最大数量")
+):
+    """获取输入联想结果"""
+    try:
+        if session_id:
+            session = typeahead_service.get_session(session_id)
+            suggestion = await session.submit(q, engine_name=engine, limit=limit)
+        else:
+            suggestion = await typeahead_service.suggest(q, engine_name=engine, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return _build_response(suggestion, q)
+
+
+def _parse_message(text: str) -> Dict[str, Any]:
+    """
+    解析并校验WebSocket消息
+
+    异常:
+        ValueError: 消息不是合法的联想请求
+    """
+    try:
+        message = json.loads(text)
+    except ValueError:
+        raise ValueError("消息必须是JSON对象")
+    if not isinstance(message, dict):
+        raise ValueError("消息必须是JSON对象")
+
+    query = message.get("query")
+    if not isinstance(query, str):
+        raise ValueError("query 必须是字符串")
+    engine = message.get("engine")
+    if engine is not None and not isinstance(engine, str):
+        raise ValueError("engine 必须是字符串")
+    limit = message.get("limit")
+    if limit is not None and (isinstance(limit, bool) or not isinstance(limit, int) or not 1 <= limit <= 50):
+        raise ValueError("limit 必须是1到50之间的整数")
+
+    return {"query": query, "engine": engine, "limit": limit}
+
+
+@router.websocket("/ws")
+async def suggest_ws(websocket: WebSocket):
+    """
+    通过WebSocket获取输入联想结果
+    客户端每次输入发送 {"query": ..., "engine": ..., "limit": ...}，
+    被后续输入取代的请求不会返回结果，无效的消息返回 {"error": ...}
+    """
+    await websocket.accept()
+    session = TypeaheadSession(typeahead_service)
+    pending = set()
+
+    async def respond(message: Dict[str, Any]) -> None:
+        query = message["query"]
+        try:
+            suggestion = await session.submit(
+                query,
+                engine_name=message["engine"],
+                limit=message["limit"]
+            )
+        except ValueError as e:
+            await websocket.send_json({"query": query, "error": str(e)})
+            return
+        except Exception as e:
+            logger.error(f"输入联想失败: {str(e)}", exc_info=True)
+            await websocket.send_json({"query": query, "error": f"输入联想失败: {str(e)}"})
+            return
+
+        if suggestion is not None:
+            await websocket.send_json(_build_response(suggestion, query).model_dump())
+
+    try:
+        while True:
+            text = await websocket.receive_text()
+            try:
+                message = _parse_message(text)
+            except ValueError as e:
+                await websocket.send_json({"error": str(e)})
+                continue
+
+            task = asyncio.ensure_future(respond(message))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        session.close()
+        for task in pending:
+            task.cancel()
+
+
+@router.get("/stats")
+async def get_typeahead_stats() -> Dict[str, Any]:
+    """获取输入联想统计信息"""
+    return {
+        "status": "enabled",
+        "stats": typeahead_service.stats
+    }
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+查询日志回放工具
+按原始请求间隔(可加速)将查询日志回放到服务，用于复现生产流量进行压测或预热缓存
+
+用法:
+    python -m app.cli.replay logs/queries/*.ndjson.gz --base-url http://localhost:8000 --speed 2
+    python -m app.cli.replay logs/queries/*.ndjson.gz --warm-cache --concurrency 8
+"""
+import argparse
+import asyncio
+import gzip
+import heapq
+import json
+import time
+from collections import Counter
+from typing import Dict, Any, Iterator, List, Optional
+
+import httpx
+
+from app.services.query_log_service import REPLAY_HEADER
+
+
+def _read_file(path: str, only_ok: bool) -> Iterator[Dict[str, Any]]:
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if only_ok and record.get("status") != 200:
+                continue
+            yield record
+
+
+def read_records(paths: List[str], only_ok: bool = True) -> Iterator[Dict[str, Any]]:
+    """
+    按时间顺序流式读取查询日志记录
+    每个日志文件内的记录按写入顺序排列，多个文件按 ts 归并，不会将全部记录读入内存
+    """
+    return heapq.merge(
+        *(_read_file(path, only_ok) for path in paths),
+        key=lambda record: record.get("ts", 0)
+    )
+
+
+def build_params(record: Dict[str, Any], warm_cache: bool = False) -> Dict[str, Any]:
+    """将日志记录转换为搜索请求参数"""
+    params = {
+        "query": record["query"],
+        "num_results": record.get("num_results") or 10,
+        "start_index": record.get("start_index") or 1,
+        "use_cache": True if warm_cache else bool(record.get("use_cache", True)),
+        "routing": bool(record.get("routing", False)),
+        "merge": bool(record.get("merge", False))
+    }
+    if record.get("engine"):
+        params["engine"] = record["engine"]
+    return params
+
+
+def _percentile(values: List[float], percentile: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percentile))]
+
+
+async def replay(
+    records: Iterator[Dict[str, Any]],
+    client: httpx.AsyncClient,
+    speed: float = 1.0,
+    concurrency: int = 16,
+    warm_cache: bool = False,
+    limit: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    回放查询日志
+
+    参数:
+        records: 查询日志记录
+        client: 指向服务的HTTP客户端
+        speed: 回放速度倍数，0表示不保留请求间隔、尽快发送
+        concurrency: 并发发送请求的工作协程数
+        warm_cache: 预热缓存模式，强制使用缓存并忽略请求间隔
+        limit: 最多回放的记录数
+
+    返回:
+        回放统计信息
+    """
+    statuses: Counter = Counter()
+    cache_outcomes: Counter = Counter()
+    latencies: List[float] = []
+    # 有界队列：所有工作协程繁忙时暂停读取日志，内存占用与日志大小无关
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+
+    async def send(record: Dict[str, Any]) -> None:
+        start_time = time.perf_counter()
+        try:
+            response = await client.get("/api/search/search", params=build_params(record, warm_cache))
+        except httpx.HTTPError as e:
+            statuses[type(e).__name__] += 1
+            return
+        latencies.append((time.perf_counter() - start_time) * 1000)
+        statuses[response.status_code] += 1
+        if response.status_code == 200:
+            cache_info = response.json().get("cache_info", {})
+            cache_outcomes["stale" if cache_info.get("stale") else "hit" if cache_info.get("used") else "miss"] += 1
+
+    async def worker() -> None:
+        while True:
+            record = await queue.get()
+            if record is None:
+                return
+            await send(record)
+
+    workers = [asyncio.ensure_future(worker()) for _ in range(concurrency)]
+    keep_timing = speed > 0 and not warm_cache
+    replay_start = time.perf_counter()
+    first_ts = None
+    sent = 0
+
+    try:
+        for record in records:
+            if limit is not None and sent >= limit:
+                break
+            if keep_timing:
+                # 保留原始请求间隔以复现流量形态
+                if first_ts is None:
+                    first_ts = record.get("ts", 0)
+                delay = (record.get("ts", 0) - first_ts) / speed - (time.perf_counter() - replay_start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            await queue.put(record)
+            sent += 1
+
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+    finally:
+        for task in workers:
+            task.cancel()
+    elapsed = time.perf_counter() - replay_start
+
+    return {
+        "requests": sent,
+        "elapsed_s": round(elapsed, 2),
+        "throughput_rps": round(sent / elapsed, 2) if elapsed > 0 else 0,
+        "statuses": {str(status): n for status, n in statuses.items()},
+        "cache": dict(cache_outcomes),
+        "latency_ms": {
+            "p50": round(_percentile(latencies, 0.5), 2),
+            "p95": round(_percentile(latencies, 0.95), 2),
+            "p99": round(_percentile(latencies, 0.99), 2),
+            "max": round(max(latencies), 2) if latencies else 0
+        }
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="回放查询日志，用于压测或预热缓存")
+    parser.add_argument("paths", nargs="+", help="查询日志文件(.ndjson 或 .ndjson.gz)")
+    parser.add_argument("--base-url", default="http://localhost:8000", help="服务地址")
+    parser.add_argument("--in-process", action="store_true", help="直接在进程内回放到应用，无需启动服务")
+    parser.add_argument("--speed", type=float, default=1.0, help="回放速度倍数，0表示尽快发送")
+    parser.add_argument("--concurrency", type=int, default=16, help="最大并发请求数")
+    parser.add_argument("--warm-cache", action="store_true", help="预热缓存模式：强制使用缓存并忽略请求间隔")
+    parser.add_argument("--include-errors", action="store_true", help="同时回放原本失败的请求")
+    parser.add_argument("--limit", type=int, default=None, help="最多回放的记录数")
+    parser.add_argument("--timeout", type=float, default=30.0, help="单个请求超时(秒)")
+    args = parser.parse_args(argv)
+
+    records = read_records(args.paths, only_ok=not args.include_errors)
+
+    async def run() -> Dict[str, Any]:
+        if args.in_process:
+            from app.main import app
+            transport = httpx.ASGITransport(app=app)
+            base_url = "http://replay"
+        else:
+            transport = None
+            base_url = args.base_url
+
+        # 标记回放请求，避免其被再次记录为生产流量
+        async with httpx.AsyncClient(
+            transport=transport,
+            base_url=base_url,
+            timeout=args.timeout,
+            headers={REPLAY_HEADER: "1"}
+        ) as client:
+            return await replay(
+                records,
+                client,
+                speed=args.speed,
+                concurrency=args.concurrency,
+                warm_cache=args.warm_cache,
+                limit=args.limit
+            )
+
+    print(json.dumps(asyncio.run(run()), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
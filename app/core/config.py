@@ -1,3 +1,4 @@
+import json
 import os
 from typing import Dict, Any, Optional
 from pydantic_settings import BaseSettings
@@ -17,9 +18,53 @@ class Settings(BaseSettings):
     GOOGLE_API_KEY: Optional[str] = os.getenv("GOOGLE_API_KEY")
     GOOGLE_CSE_ID: Optional[str] = os.getenv("GOOGLE_CSE_ID")
     
+    # 搜索引擎插件设置
+    SEARCH_ENGINE_PLUGINS: str = os.getenv("SEARCH_ENGINE_PLUGINS", "")  # 插件引擎列表: "name=module:Class,..."
+    SEARCH_ENGINE_CONFIG: str = os.getenv("SEARCH_ENGINE_CONFIG", "")  # 插件引擎配置(JSON): {"name": {"config": {...}, "cost_per_query": 0.0}}
+    SEARCH_ENGINES_DISABLED: str = os.getenv("SEARCH_ENGINES_DISABLED", "")  # 禁用的引擎列表: "name,..."
+    SEARCH_ENGINE_ENTRY_POINTS: bool = os.getenv("SEARCH_ENGINE_ENTRY_POINTS", "True").lower() in ("true", "1", "t")  # 是否通过 entry points 发现引擎
+    
     # 缓存设置
     CACHE_ENABLED: bool = os.getenv("CACHE_ENABLED", "True").lower() in ("true", "1", "t")
     CACHE_TTL: int = int(os.getenv("CACHE_TTL", "3600"))  # 默认缓存1小时
+    CACHE_STALE_TTL: int = int(os.getenv("CACHE_STALE_TTL", "600"))  # 过期后保留用于降级响应的时间(秒)
+    CACHE_STALE_MAX_ITEMS: int = int(os.getenv("CACHE_STALE_MAX_ITEMS", "1000"))  # 保留用于降级响应的过期项最大数量
+    
+    # 准入控制设置
+    ADMISSION_ENABLED: bool = os.getenv("ADMISSION_ENABLED", "True").lower() in ("true", "1", "t")
+    ADMISSION_MAX_CONCURRENCY: int = int(os.getenv("ADMISSION_MAX_CONCURRENCY", "32"))  # 最大并发搜索数
+    ADMISSION_MAX_QUEUE: int = int(os.getenv("ADMISSION_MAX_QUEUE", "64"))  # 最大排队请求数
+    ADMISSION_QUEUE_TIMEOUT: float = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "2.0"))  # 排队等待上限(秒)
+    ADMISSION_RETRY_AFTER: int = int(os.getenv("ADMISSION_RETRY_AFTER", "1"))  # 503响应的Retry-After(秒)
+    ADMISSION_STALE_FALLBACK: bool = os.getenv("ADMISSION_STALE_FALLBACK", "True").lower() in ("true", "1", "t")
+    
+    # 输入联想设置
+    TYPEAHEAD_DEBOUNCE_MS: int = int(os.getenv("TYPEAHEAD_DEBOUNCE_MS", "150"))  # 防抖时间(毫秒)
+    TYPEAHEAD_MIN_CHARS: int = int(os.getenv("TYPEAHEAD_MIN_CHARS", "2"))  # 触发联想的最少字符数
+    TYPEAHEAD_NUM_RESULTS: int = int(os.getenv("TYPEAHEAD_NUM_RESULTS", "5"))  # 每个引擎返回的结果数量
+    TYPEAHEAD_SUGGESTION_LIMIT: int = int(os.getenv("TYPEAHEAD_SUGGESTION_LIMIT", "8"))  # 联想查询最大数量
+    TYPEAHEAD_MAX_ENTRIES: int = int(os.getenv("TYPEAHEAD_MAX_ENTRIES", "5000"))  # 前缀树最大条目数
+    TYPEAHEAD_MAX_SESSIONS: int = int(os.getenv("TYPEAHEAD_MAX_SESSIONS", "10000"))  # HTTP会话最大数量
+    
+    # 智能路由设置
+    ROUTING_WINDOW_SIZE: int = int(os.getenv("ROUTING_WINDOW_SIZE", "100"))  # 引擎画像的滑动窗口大小
+    ROUTING_HEDGE_AFTER_MS: int = int(os.getenv("ROUTING_HEDGE_AFTER_MS", "800"))  # 超过该时间未返回则扇出到下一个引擎
+    ROUTING_MIN_RESULTS_RATIO: float = float(os.getenv("ROUTING_MIN_RESULTS_RATIO", "0.5"))  # 结果数低于请求数的该比例时扇出
+    ROUTING_LATENCY_WEIGHT: float = float(os.getenv("ROUTING_LATENCY_WEIGHT", "1.0"))  # 得分中p95延迟(秒)的权重
+    ROUTING_ERROR_WEIGHT: float = float(os.getenv("ROUTING_ERROR_WEIGHT", "5.0"))  # 得分中错误率的权重
+    ROUTING_COST_WEIGHT: float = float(os.getenv("ROUTING_COST_WEIGHT", "100.0"))  # 得分中单次调用成本的权重
+    
+    # 查询日志设置
+    QUERY_LOG_ENABLED: bool = os.getenv("QUERY_LOG_ENABLED", "True").lower() in ("true", "1", "t")
+    QUERY_LOG_DIR: str = os.getenv("QUERY_LOG_DIR", "logs/queries")  # 日志文件目录
+    QUERY_LOG_QUEUE_SIZE: int = int(os.getenv("QUERY_LOG_QUEUE_SIZE", "10000"))  # 内存队列容量，超出时丢弃
+    QUERY_LOG_BATCH_SIZE: int = int(os.getenv("QUERY_LOG_BATCH_SIZE", "500"))  # 每批写入的最大记录数
+    QUERY_LOG_FLUSH_INTERVAL: float = float(os.getenv("QUERY_LOG_FLUSH_INTERVAL", "1.0"))  # 写入间隔(秒)
+    QUERY_LOG_MAX_BYTES: int = int(os.getenv("QUERY_LOG_MAX_BYTES", str(64 * 1024 * 1024)))  # 单个文件最大字节数
+    QUERY_LOG_ROTATE_SECONDS: int = int(os.getenv("QUERY_LOG_ROTATE_SECONDS", "3600"))  # 单个文件最长写入时间(秒)
+    
+    # 结果合并设置
+    MERGE_RRF_K: int = int(os.getenv("MERGE_RRF_K", "60"))  # 倒数排名融合的平滑常数
     
     class Config:
         env_file = ".env"
@@ -28,14 +73,80 @@ class Settings(BaseSettings):
 settings = Settings()
 
 
-# 搜索引擎配置
-SEARCH_ENGINES = {
-    "google": {
-        "is_enabled": bool(settings.GOOGLE_API_KEY and settings.GOOGLE_CSE_ID),
-        "config": {
-            "api_key": settings.GOOGLE_API_KEY,
-            "cse_id": settings.GOOGLE_CSE_ID
+def parse_engine_config(raw: str) -> Dict[str, Dict[str, Any]]:
+    """
+    解析 SEARCH_ENGINE_CONFIG
+    
+    异常:
+        ValueError: 配置不是合法的JSON对象，引擎配置不是对象，或 cost_per_query 不是非负数
+    """
+    try:
+        engine_configs = json.loads(raw or "{}")
+    except ValueError as e:
+        raise ValueError(f"SEARCH_ENGINE_CONFIG 不是有效的JSON: {str(e)}")
+    if not isinstance(engine_configs, dict):
+        raise ValueError("SEARCH_ENGINE_CONFIG 必须是JSON对象: {\"引擎名称\": {...}}")
+    for name, engine_config in engine_configs.items():
+        if not isinstance(engine_config, dict):
+            raise ValueError(f"SEARCH_ENGINE_CONFIG 中引擎 '{name}' 的配置必须是JSON对象")
+        if "config" in engine_config and not isinstance(engine_config["config"], dict):
+            raise ValueError(f"SEARCH_ENGINE_CONFIG 中引擎 '{name}' 的 config 必须是JSON对象")
+        if "cost_per_query" in engine_config:
+            cost = engine_config["cost_per_query"]
+            if isinstance(cost, bool) or not isinstance(cost, (int, float)) or cost < 0:
+                raise ValueError(f"SEARCH_ENGINE_CONFIG 中引擎 '{name}' 的 cost_per_query 必须是非负数")
+    return engine_configs
+
+
+def build_search_engines(current_settings: Settings, strict: bool = True) -> Dict[str, Dict[str, Any]]:
+    """
+    根据配置构建搜索引擎配置
+    引擎类以导入路径给出，由引擎注册表在首次使用时导入
+    
+    参数:
+        current_settings: 应用配置
+        strict: SEARCH_ENGINE_CONFIG 无效时是否抛出异常，为False时忽略该配置并打印错误
+    
+    异常:
+        ValueError: strict 为True且 SEARCH_ENGINE_CONFIG 无效
+    """
+    search_engines = {
+        "google": {
+            "is_enabled": bool(current_settings.GOOGLE_API_KEY and current_settings.GOOGLE_CSE_ID),
+            "class": "app.services.search_engines.google:GoogleSearchEngine",
+            "config": {
+                "api_key": current_settings.GOOGLE_API_KEY,
+                "cse_id": current_settings.GOOGLE_CSE_ID
+            },
+            "cost_per_query": 0.005  # 每1000次查询5美元
         }
+        # 在此处添加更多搜索引擎配置
     }
-    # 在此处添加更多搜索引擎配置
-} 
\ No newline at end of file
+    
+    # 插件引擎: "name=module:Class,..."
+    for plugin in current_settings.SEARCH_ENGINE_PLUGINS.split(","):
+        name, _, target = plugin.strip().partition("=")
+        if name and target:
+            search_engines[name.strip()] = {"is_enabled": True, "class": target.strip(), "config": {}}
+    
+    # 插件引擎的配置，也可用于覆盖通过 entry points 发现的引擎配置
+    try:
+        engine_configs = parse_engine_config(current_settings.SEARCH_ENGINE_CONFIG)
+    except ValueError as e:
+        if strict:
+            raise
+        print(f"忽略插件引擎配置: {str(e)}")
+        engine_configs = {}
+    
+    for name, engine_config in engine_configs.items():
+        entry = search_engines.setdefault(name, {"is_enabled": True})
+        entry["config"] = engine_config.get("config", entry.get("config", {}))
+        if "cost_per_query" in engine_config:
+            entry["cost_per_query"] = engine_config["cost_per_query"]
+    
+    for name in current_settings.SEARCH_ENGINES_DISABLED.split(","):
+        if name.strip():
+            search_engines[name.strip()] = {"is_enabled": False}
+    
+    return search_engines
+
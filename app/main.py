@@ -7,6 +7,7 @@ from typing import Dict, Any
 
 from app.api import api_router
 from app.core.config import settings
+from app.services.query_log_service import query_log_service
 
 # 配置日志
 logging.basicConfig(
@@ -42,6 +43,16 @@ async def global_exception_handler(request: Request, exc: Exception):
         content={"detail": "服务器内部错误，请稍后再试"},
     )
 
+# 启动和关闭时管理查询日志后台写入任务
+@app.on_event("startup")
+async def start_query_log():
+    query_log_service.start()
+
+
+@app.on_event("shutdown")
+async def stop_query_log():
+    await query_log_service.stop()
+
 # 注册API路由
 app.include_router(api_router, prefix="/api")
 
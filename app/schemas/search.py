@@ -20,6 +20,9 @@ class SearchRequest(BaseModel):
     num_results: Optional[int] = Field(10, ge=1, le=50, description="返回结果数量")
     start_index: Optional[int] = Field(1, ge=1, description="结果起始索引")
     use_cache: Optional[bool] = Field(True, description="是否使用缓存(如果缓存功能已启用)")
+    routing: Optional[bool] = Field(False, description="是否按延迟、错误率和成本智能选择引擎(仅在未指定引擎时生效)")
+    merge: Optional[bool] = Field(False, description="是否合并各引擎结果为去重后的单一列表")
+    fields: Optional[List[str]] = Field(None, description="合并模式下需要保留或排除(以 - 开头)的结果字段，例如 title, additional_info.displayLink, -additional_info.htmlSnippet")
 
 
 class SearchResponse(BaseModel):
@@ -28,6 +31,7 @@ class SearchResponse(BaseModel):
     engines_used: List[str]
     total_results: int
     results: Dict[str, List[SearchResultItem]]
+    merged_results: Optional[List[Dict[str, Any]]] = Field(None, description="合并模式下去重并按倒数排名融合排序的结果")
     metadata: Dict[str, Any] = Field(default_factory=dict)
     cache_info: Dict[str, Any] = Field(default_factory=dict, description="缓存相关信息")
 
@@ -42,4 +46,12 @@ class EngineInfo(BaseModel):
 class AvailableEnginesResponse(BaseModel):
     """可用搜索引擎响应模型"""
     engines: List[EngineInfo]
-    total: int 
\ No newline at end of file
+    total: int 
+
+class TypeaheadResponse(BaseModel):
+    """输入联想响应模型"""
+    query: str
+    suggestions: List[str] = Field(default_factory=list, description="以当前输入为前缀的已缓存查询")
+    results: Dict[str, List[SearchResultItem]] = Field(default_factory=dict)
+    source: str = Field("none", description="结果来源: trie, prefix, upstream 或 none")
+    superseded: bool = Field(default=False, description="请求是否已被同一会话的后续输入取代")
@@ -0,0 +1,129 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional
+
+from app.core.config import settings
+
+
+class AdmissionRejected(Exception):
+    """请求因服务过载被拒绝"""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"服务繁忙，请求被拒绝: {reason}")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    准入控制服务，限制并发搜索数量并维护有界等待队列
+    超出队列容量或等待超时的请求会被立即拒绝(负载削减)
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(AdmissionController, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self._initialized = True
+        self.max_concurrency = settings.ADMISSION_MAX_CONCURRENCY
+        self.max_queue = settings.ADMISSION_MAX_QUEUE
+        # 信号量在首次使用时创建，确保绑定到运行中的事件循环
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._active = 0
+        self._waiting = 0
+        # 准入统计信息
+        self._stats = {
+            "admitted": 0,
+            "shed_queue_full": 0,
+            "shed_timeout": 0,
+            "stale_served": 0
+        }
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def acquire(self, timeout: Optional[float] = None) -> None:
+        """
+        获取执行槽位
+
+        参数:
+            timeout: 排队等待上限(秒)，如果为None则使用默认值
+
+        异常:
+            AdmissionRejected: 队列已满或等待超时
+        """
+        if timeout is None:
+            timeout = settings.ADMISSION_QUEUE_TIMEOUT
+
+        semaphore = self._get_semaphore()
+
+        if semaphore.locked():
+            # 没有空闲槽位，检查等待队列是否已满
+            if self._waiting >= self.max_queue:
+                self._stats["shed_queue_full"] += 1
+                raise AdmissionRejected("queue_full", settings.ADMISSION_RETRY_AFTER)
+
+            self._waiting += 1
+            try:
+                await asyncio.wait_for(semaphore.acquire(), timeout=timeout)
+            except asyncio.TimeoutError:
+                self._stats["shed_timeout"] += 1
+                raise AdmissionRejected("timeout", settings.ADMISSION_RETRY_AFTER)
+            finally:
+                self._waiting -= 1
+        else:
+            await semaphore.acquire()
+
+        self._active += 1
+        self._stats["admitted"] += 1
+
+    def release(self) -> None:
+        """释放执行槽位"""
+        self._active -= 1
+        self._get_semaphore().release()
+
+    @asynccontextmanager
+    async def slot(self, timeout: Optional[float] = None):
+        """在准入控制下执行代码块，准入控制禁用时直接执行"""
+        if not settings.ADMISSION_ENABLED:
+            yield
+            return
+
+        await self.acquire(timeout)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def record_stale_served(self) -> None:
+        """记录一次以过期缓存代替拒绝的降级响应"""
+        self._stats["stale_served"] += 1
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """获取准入控制统计信息"""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "active": self._active,
+            "queue_depth": self._waiting,
+            "admitted": self._stats["admitted"],
+            "shed_queue_full": self._stats["shed_queue_full"],
+            "shed_timeout": self._stats["shed_timeout"],
+            "shed_total": self._stats["shed_queue_full"] + self._stats["shed_timeout"],
+            "stale_served": self._stats["stale_served"]
+        }
+
+
+# 创建准入控制服务实例
+admission_controller = AdmissionController()
@@ -1,4 +1,5 @@
 import time
+from collections import OrderedDict
 from typing import Dict, Any, Optional, Tuple, List
 import hashlib
 import json
@@ -27,11 +28,14 @@ class CacheService:
         self._initialized = True
         # 缓存存储: {缓存键: (过期时间, 缓存内容)}
         self._cache: Dict[str, Tuple[float, Any]] = {}
+        # 已过期但仍保留用于降级响应的缓存键，按过期先后排序，数量不超过 CACHE_STALE_MAX_ITEMS
+        self._stale_keys: "OrderedDict[str, None]" = OrderedDict()
         # 缓存统计信息
         self._stats = {
             "hits": 0,
             "misses": 0,
-            "expirations": 0
+            "expirations": 0,
+            "stale_hits": 0
         }
     
     def _generate_key(self, query: str, engine: Optional[str], params: Dict[str, Any]) -> str:
@@ -70,14 +74,74 @@ class CacheService:
             if current_time < expire_time:
                 self._stats["hits"] += 1
                 return content
-            else:
-                # 删除过期内容
-                del self._cache[cache_key]
+            elif current_time >= expire_time + settings.CACHE_STALE_TTL:
+                # 超出陈旧保留窗口，删除过期内容
+                self._delete(cache_key)
                 self._stats["expirations"] += 1
+            else:
+                self._retain_stale(cache_key)
         
         self._stats["misses"] += 1
         return None
     
+    def _delete(self, cache_key: str) -> None:
+        del self._cache[cache_key]
+        self._stale_keys.pop(cache_key, None)
+    
+    def _retain_stale(self, cache_key: str) -> None:
+        """保留已过期的缓存项用于降级响应，超出数量上限时删除最早过期的项"""
+        if cache_key in self._stale_keys:
+            return
+        self._stale_keys[cache_key] = None
+        while len(self._stale_keys) > settings.CACHE_STALE_MAX_ITEMS:
+            oldest_key, _ = self._stale_keys.popitem(last=False)
+            del self._cache[oldest_key]
+            self._stats["expirations"] += 1
+    
+    def peek(self, query: str, engine: Optional[str] = None, **params) -> Optional[Any]:
+        """
+        查看未过期的缓存内容，不影响命中统计
+        
+        参数:
+            query: 搜索查询
+            engine: 搜索引擎名称
+            **params: 其他搜索参数
+        
+        返回:
+            缓存内容，如果不存在或已过期则返回None
+        """
+        entry = self._cache.get(self._generate_key(query, engine, params))
+        if entry is not None and time.time() < entry[0]:
+            return entry[1]
+        return None
+    
+    def get_stale(self, query: str, engine: Optional[str] = None, **params) -> Optional[Tuple[Any, bool]]:
+        """
+        获取缓存内容，允许返回已过期但仍在陈旧保留窗口内的内容
+        用于服务过载时的降级响应，不影响命中统计；只有确实已过期的内容才计入 stale_hits
+        
+        参数:
+            query: 搜索查询
+            engine: 搜索引擎名称
+            **params: 其他搜索参数
+        
+        返回:
+            (缓存内容, 是否已过期)，如果不存在或超出陈旧保留窗口则返回None
+        """
+        cache_key = self._generate_key(query, engine, params)
+        
+        if cache_key in self._cache:
+            expire_time, content = self._cache[cache_key]
+            current_time = time.time()
+            if current_time < expire_time:
+                return content, False
+            if current_time < expire_time + settings.CACHE_STALE_TTL:
+                self._retain_stale(cache_key)
+                self._stats["stale_hits"] += 1
+                return content, True
+        
+        return None
+    
     def set(self, query: str, content: Any, ttl: int = None, engine: Optional[str] = None, **params) -> None:
         """
         设置缓存内容
@@ -95,29 +159,40 @@ class CacheService:
         cache_key = self._generate_key(query, engine, params)
         expire_time = time.time() + ttl
         self._cache[cache_key] = (expire_time, content)
+        self._stale_keys.pop(cache_key, None)
     
     def clear(self) -> None:
         """清空所有缓存"""
         self._cache.clear()
+        self._stale_keys.clear()
         
     def clear_expired(self) -> int:
         """
-        清除所有过期的缓存项
+        清除所有超出陈旧保留窗口的过期缓存项
+        仍在保留窗口内的过期项会保留用于降级响应，但受 CACHE_STALE_MAX_ITEMS 限制
         
         返回:
             清除的缓存项数量
         """
         current_time = time.time()
-        expired_keys = [
-            key for key, (expire_time, _) in self._cache.items()
-            if current_time >= expire_time
-        ]
+        expired_keys = []
+        stale_items = []
+        for key, (expire_time, _) in self._cache.items():
+            if current_time >= expire_time + settings.CACHE_STALE_TTL:
+                expired_keys.append(key)
+            elif current_time >= expire_time:
+                stale_items.append((expire_time, key))
         
         for key in expired_keys:
-            del self._cache[key]
-        
+            self._delete(key)
         self._stats["expirations"] += len(expired_keys)
-        return len(expired_keys)
+        
+        # 按过期先后登记保留的过期项，超出上限的部分也会被清除
+        items_before = len(self._cache)
+        for _, key in sorted(stale_items):
+            self._retain_stale(key)
+        
+        return len(expired_keys) + items_before - len(self._cache)
     
     @property
     def stats(self) -> Dict[str, Any]:
@@ -129,7 +204,9 @@ class CacheService:
             "hits": self._stats["hits"],
             "misses": self._stats["misses"],
             "expirations": self._stats["expirations"],
+            "stale_hits": self._stats["stale_hits"],
             "items_count": len(self._cache),
+            "stale_items_count": len(self._stale_keys),
             "hit_rate": f"{hit_rate:.2f}%"
         }
 
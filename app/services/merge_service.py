@@ -0,0 +1,174 @@
+import hashlib
+from typing import Dict, Any, List, Optional, Set
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+from app.core.config import settings
+from app.services.search_engines import SearchResult
+from app.services.cache_service import cache_service
+
+# 不影响页面内容的跟踪参数
+TRACKING_PARAMS = {"gclid", "fbclid", "msclkid", "yclid", "ref", "ref_src"}
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """
+    规范化URL用于去重
+    忽略协议、www前缀、默认端口、片段、跟踪参数、查询参数顺序和末尾斜杠
+    """
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    if port and port != DEFAULT_PORTS.get(parts.scheme.lower()):
+        host = f"{host}:{port}"
+
+    path = parts.path.rstrip("/")
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    )
+    normalized = f"{host}{path}"
+    if query:
+        normalized += "?" + urlencode(query)
+    return normalized
+
+
+def url_id(url: str) -> str:
+    """计算规范化URL的短哈希，作为合并结果的ID"""
+    return hashlib.sha1(normalize_url(url).encode("utf-8")).hexdigest()[:16]
+
+
+def merge_results(
+    results: Dict[str, List[SearchResult]],
+    exclude_ids: Optional[Set[str]] = None,
+    k: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    合并多个引擎的搜索结果
+    按规范化URL去重，并使用倒数排名融合(RRF)计算综合得分: score = Σ 1 / (k + rank)
+
+    参数:
+        results: 搜索结果字典，键为引擎名称
+        exclude_ids: 需要排除的结果ID(例如前几页已返回的结果)
+        k: RRF平滑常数，如果为None则使用默认值
+
+    返回:
+        按综合得分排序的合并结果列表
+    """
+    if k is None:
+        k = settings.MERGE_RRF_K
+    exclude_ids = exclude_ids or set()
+
+    merged: Dict[str, Dict[str, Any]] = {}
+    for engine_name, engine_results in results.items():
+        for rank, result in enumerate(engine_results, start=1):
+            result_id = url_id(result.link)
+            if result_id in exclude_ids:
+                continue
+
+            item = merged.get(result_id)
+            if item is None:
+                item = {
+                    "id": result_id,
+                    "title": result.title,
+                    "link": result.link,
+                    "snippet": result.snippet,
+                    "score": 0.0,
+                    "sources": [],
+                    "additional_info": result.additional_info,
+                    "is_from_cache": result.is_from_cache,
+                    "_best_rank": rank
+                }
+                merged[result_id] = item
+            elif rank < item["_best_rank"]:
+                # 使用排名最靠前的结果作为展示内容
+                item.update(
+                    title=result.title,
+                    link=result.link,
+                    snippet=result.snippet,
+                    additional_info=result.additional_info,
+                    _best_rank=rank
+                )
+
+            if any(source["engine"] == engine_name for source in item["sources"]):
+                # 同一引擎内的重复结果只计一次
+                continue
+            item["score"] += 1.0 / (k + rank)
+            item["sources"].append({"engine": engine_name, "position": result.position or rank})
+            item["is_from_cache"] = item["is_from_cache"] and result.is_from_cache
+
+    items = sorted(merged.values(), key=lambda item: (-item["score"], item["_best_rank"]))
+    for position, item in enumerate(items, start=1):
+        del item["_best_rank"]
+        item["score"] = round(item["score"], 6)
+        item["position"] = position
+    return items
+
+
+def previous_page_ids(query: str, engine_names: List[str], num: int, start: int) -> Set[str]:
+    """
+    获取同一查询前几页已缓存结果的ID，用于跨页去重
+    只读取缓存，不会请求搜索引擎
+    """
+    ids: Set[str] = set()
+    for page_start in range(1, start, num):
+        for engine_name in engine_names:
+            cached_results = cache_service.peek(query, engine_name, num=num, start=page_start)
+            for result in cached_results or []:
+                ids.add(url_id(result.link))
+    return ids
+
+
+def project_fields(items: List[Dict[str, Any]], fields: Optional[List[str]]) -> List[Dict[str, Any]]:
+    """
+    按字段列表裁剪合并结果，id 总是保留
+    字段以 "-" 开头表示排除该字段，例如 -additional_info.htmlSnippet；
+    没有指定需要保留的字段时保留所有未排除的字段。
+    additional_info.htmlSnippet 形式可选择或排除 additional_info 中的单个字段
+
+    参数:
+        items: 合并结果列表
+        fields: 需要保留或排除的字段，如果为空则返回完整结果
+    """
+    if not fields:
+        return items
+
+    include_fields: Set[str] = set()
+    include_info: Set[str] = set()
+    exclude_fields: Set[str] = set()
+    exclude_info: Set[str] = set()
+    for field in fields:
+        field = field.strip()
+        excluded = field.startswith("-")
+        name, _, sub_field = field.lstrip("-").partition(".")
+        if not name:
+            continue
+        if name == "additional_info" and sub_field:
+            (exclude_info if excluded else include_info).add(sub_field)
+        else:
+            (exclude_fields if excluded else include_fields).add(name)
+    exclude_fields.discard("id")
+
+    keep_all = not include_fields and not include_info
+    projected = []
+    for item in items:
+        projected_item = {
+            key: value for key, value in item.items()
+            if key == "id" or ((keep_all or key in include_fields) and key not in exclude_fields)
+        }
+
+        if "additional_info" not in exclude_fields and (keep_all or include_info or "additional_info" in include_fields):
+            info = item["additional_info"]
+            if include_info and "additional_info" not in include_fields:
+                info = {key: value for key, value in info.items() if key in include_info}
+            if exclude_info:
+                info = {key: value for key, value in info.items() if key not in exclude_info}
+            projected_item["additional_info"] = info
+
+        projected.append(projected_item)
+    return projected
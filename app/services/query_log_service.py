@@ -0,0 +1,161 @@
+import asyncio
+import gzip
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+from app.core.config import settings
+
+# 回放工具在请求中携带该请求头，服务不会为这些请求记录查询日志
+REPLAY_HEADER = "X-Query-Replay"
+
+
+class QueryLogService:
+    """
+    查询日志服务
+    请求处理过程中只将记录放入有界内存队列(不等待)，由后台任务批量写入按大小或时间轮转的压缩NDJSON文件
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(QueryLogService, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self._initialized = True
+        self._queue: deque = deque()
+        self._writer_task: Optional[asyncio.Task] = None
+        self._current_path: Optional[str] = None
+        self._current_opened_at = 0.0
+        self._file_index = 0
+        self._write_lock = threading.Lock()
+        # 日志统计信息
+        self._stats = {
+            "logged": 0,
+            "written": 0,
+            "dropped": 0,
+            "write_errors": 0,
+            "files_rotated": 0
+        }
+
+    def log(self, record: Dict[str, Any]) -> None:
+        """
+        记录一条查询日志，不阻塞也不等待写入
+
+        参数:
+            record: 查询日志记录
+        """
+        if not settings.QUERY_LOG_ENABLED:
+            return
+
+        if len(self._queue) >= settings.QUERY_LOG_QUEUE_SIZE:
+            # 队列已满时丢弃新记录，避免影响请求延迟
+            self._stats["dropped"] += 1
+            return
+
+        record.setdefault("ts", time.time())
+        self._queue.append(record)
+        self._stats["logged"] += 1
+
+    def _drain(self) -> List[Dict[str, Any]]:
+        batch = []
+        while self._queue and len(batch) < settings.QUERY_LOG_BATCH_SIZE:
+            batch.append(self._queue.popleft())
+        return batch
+
+    def _should_rotate(self) -> bool:
+        if self._current_path is None:
+            return True
+        if time.time() - self._current_opened_at >= settings.QUERY_LOG_ROTATE_SECONDS:
+            return True
+        try:
+            return os.path.getsize(self._current_path) >= settings.QUERY_LOG_MAX_BYTES
+        except OSError:
+            return True
+
+    def _rotate(self) -> None:
+        os.makedirs(settings.QUERY_LOG_DIR, exist_ok=True)
+        self._file_index += 1
+        timestamp = time.strftime("%Y%m%d-%H%M%S")
+        filename = f"queries-{timestamp}-{os.getpid()}-{self._file_index:04d}.ndjson.gz"
+        if self._current_path is not None:
+            self._stats["files_rotated"] += 1
+        self._current_path = os.path.join(settings.QUERY_LOG_DIR, filename)
+        self._current_opened_at = time.time()
+
+    def _write_batch(self, batch: List[Dict[str, Any]]) -> None:
+        """将一批记录写入当前日志文件，每批追加为一个独立的gzip成员"""
+        lines = "".join(
+            json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+            for record in batch
+        )
+        with self._write_lock:
+            if self._should_rotate():
+                self._rotate()
+            with gzip.open(self._current_path, "at", encoding="utf-8") as f:
+                f.write(lines)
+
+    async def flush(self) -> int:
+        """
+        将队列中的所有记录写入文件
+
+        返回:
+            写入的记录数量
+        """
+        loop = asyncio.get_running_loop()
+        written = 0
+        while self._queue:
+            batch = self._drain()
+            try:
+                # 在线程池中执行文件写入，避免阻塞事件循环
+                await loop.run_in_executor(None, self._write_batch, batch)
+            except Exception as e:
+                self._stats["write_errors"] += 1
+                print(f"查询日志写入失败: {str(e)}")
+                continue
+            written += len(batch)
+            self._stats["written"] += len(batch)
+        return written
+
+    async def _run_writer(self) -> None:
+        while True:
+            await asyncio.sleep(settings.QUERY_LOG_FLUSH_INTERVAL)
+            await self.flush()
+
+    def start(self) -> None:
+        """启动后台写入任务"""
+        if settings.QUERY_LOG_ENABLED and self._writer_task is None:
+            self._writer_task = asyncio.ensure_future(self._run_writer())
+
+    async def stop(self) -> None:
+        """停止后台写入任务并写入剩余记录"""
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
+            except asyncio.CancelledError:
+                pass
+            self._writer_task = None
+        await self.flush()
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """获取查询日志统计信息"""
+        return {
+            "queue_depth": len(self._queue),
+            "current_file": self._current_path,
+            **self._stats
+        }
+
+
+# 创建查询日志服务实例
+query_log_service = QueryLogService()
@@ -0,0 +1,123 @@
+from collections import deque
+from typing import Dict, Any, List
+
+from app.core.config import settings
+from app.services.search_engines import engine_registry
+
+
+class EngineProfile:
+    """
+    搜索引擎运行画像
+    基于最近若干次上游调用的滑动窗口统计延迟和错误率，并累计调用成本
+    """
+
+    def __init__(self, name: str, cost_per_query: float = 0.0):
+        self.name = name
+        self.cost_per_query = cost_per_query
+        # 滑动窗口: [(延迟秒数, 是否出错)]
+        self._samples: deque = deque(maxlen=settings.ROUTING_WINDOW_SIZE)
+        self.calls = 0
+        self.total_cost = 0.0
+
+    def record(self, latency: float, error: bool = False) -> None:
+        """记录一次上游调用"""
+        self._samples.append((latency, error))
+        self.calls += 1
+        self.total_cost += self.cost_per_query
+
+    def _latency_percentile(self, percentile: float) -> float:
+        if not self._samples:
+            return 0.0
+        latencies = sorted(latency for latency, _ in self._samples)
+        index = min(len(latencies) - 1, int(len(latencies) * percentile))
+        return latencies[index]
+
+    @property
+    def latency_p50(self) -> float:
+        return self._latency_percentile(0.5)
+
+    @property
+    def latency_p95(self) -> float:
+        return self._latency_percentile(0.95)
+
+    @property
+    def error_rate(self) -> float:
+        if not self._samples:
+            return 0.0
+        return sum(1 for _, error in self._samples if error) / len(self._samples)
+
+    @property
+    def score(self) -> float:
+        """
+        路由得分，越低越好
+        综合尾延迟、错误率和单次调用成本；没有样本的引擎延迟和错误率记为0，会被优先尝试
+        """
+        return (
+            self.latency_p95 * settings.ROUTING_LATENCY_WEIGHT
+            + self.error_rate * settings.ROUTING_ERROR_WEIGHT
+            + self.cost_per_query * settings.ROUTING_COST_WEIGHT
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "samples": len(self._samples),
+            "calls": self.calls,
+            "latency_p50_ms": round(self.latency_p50 * 1000, 2),
+            "latency_p95_ms": round(self.latency_p95 * 1000, 2),
+            "error_rate": f"{self.error_rate * 100:.2f}%",
+            "cost_per_query": self.cost_per_query,
+            "total_cost": round(self.total_cost, 6),
+            "score": round(self.score, 4)
+        }
+
+
+class EngineRouter:
+    """
+    搜索引擎路由服务，维护每个引擎的运行画像并按得分排序
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(EngineRouter, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self._initialized = True
+        self._profiles: Dict[str, EngineProfile] = {}
+
+    def get_profile(self, name: str) -> EngineProfile:
+        """获取引擎画像，不存在时根据引擎配置创建"""
+        spec = engine_registry.get_spec(name)
+        cost = spec.cost_per_query if spec else 0.0
+        profile = self._profiles.get(name)
+        if profile is None:
+            profile = EngineProfile(name, cost)
+            self._profiles[name] = profile
+        else:
+            # 引擎配置可能已重新加载
+            profile.cost_per_query = cost
+        return profile
+
+    def record(self, name: str, latency: float, error: bool = False) -> None:
+        """记录引擎的一次上游调用"""
+        self.get_profile(name).record(latency, error)
+
+    def rank(self, engine_names: List[str]) -> List[str]:
+        """按路由得分从优到劣排序引擎"""
+        return sorted(engine_names, key=lambda name: self.get_profile(name).score)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """获取所有引擎的运行画像"""
+        return {name: profile.to_dict() for name, profile in self._profiles.items()}
+
+
+# 创建搜索引擎路由服务实例
+engine_router = EngineRouter()
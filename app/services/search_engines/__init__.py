@@ -1,4 +1,19 @@
 from .base import BaseSearchEngine, SearchResult
-from .google import GoogleSearchEngine
+from .registry import EngineRegistry, EngineSpec, engine_registry
 
-__all__ = ["BaseSearchEngine", "SearchResult", "GoogleSearchEngine"] 
\ No newline at end of file
+__all__ = [
+    "BaseSearchEngine",
+    "SearchResult",
+    "GoogleSearchEngine",
+    "EngineRegistry",
+    "EngineSpec",
+    "engine_registry",
+]
+
+
+def __getattr__(name):
+    # 引擎实现按需导入，避免启动时加载所有引擎及其依赖
+    if name == "GoogleSearchEngine":
+        from .google import GoogleSearchEngine
+        return GoogleSearchEngine
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
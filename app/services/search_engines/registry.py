@@ -0,0 +1,227 @@
+import importlib
+import threading
+from typing import Dict, Any, List, Optional, Type
+
+from .base import BaseSearchEngine
+
+ENTRY_POINT_GROUP = "web_search.engines"
+
+
+class EngineSpec:
+    """搜索引擎注册信息：引擎类的导入路径及其配置，引擎类在首次使用时才导入"""
+
+    def __init__(self, name: str, target: Any, config: Optional[Dict[str, Any]] = None, cost_per_query: float = 0.0):
+        self.name = name
+        # 导入路径 "module:Class"、entry point 对象或引擎类本身
+        self.target = target
+        self.config = config or {}
+        self.cost_per_query = cost_per_query
+
+    def load_class(self) -> Type[BaseSearchEngine]:
+        """导入并返回引擎类"""
+        if isinstance(self.target, str):
+            module_name, _, class_name = self.target.partition(":")
+            return getattr(importlib.import_module(module_name), class_name)
+        if hasattr(self.target, "load"):
+            return self.target.load()
+        return self.target
+
+    def same_as(self, other: "EngineSpec") -> bool:
+        return (
+            self.target == other.target
+            and self.config == other.config
+            and self.cost_per_query == other.cost_per_query
+        )
+
+
+class EngineRegistry:
+    """
+    搜索引擎注册表
+    通过配置和 entry points 发现搜索引擎，在首次使用时才导入和初始化，
+    并支持运行时添加、移除和重新加载引擎。
+    替换或移除引擎时只更新注册表，正在进行中的请求继续使用原有引擎实例。
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(EngineRegistry, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self._initialized = True
+        self._specs: Optional[Dict[str, EngineSpec]] = None
+        self._engines: Dict[str, BaseSearchEngine] = {}
+        # 加载失败或不可用的引擎，重新加载或注册后再次尝试
+        self._unavailable: set = set()
+        self._lock = threading.RLock()
+
+    def _discover(self, strict: bool = True) -> Dict[str, EngineSpec]:
+        """
+        从 entry points 和配置中发现搜索引擎，配置优先
+
+        异常:
+            ValueError: strict 为True且插件引擎配置无效
+        """
+        # 延迟导入，以便重新加载时读取最新的配置
+        from app.core.config import Settings, build_search_engines
+
+        current_settings = Settings()
+        specs: Dict[str, EngineSpec] = {}
+
+        if current_settings.SEARCH_ENGINE_ENTRY_POINTS:
+            for entry_point in _iter_entry_points(ENTRY_POINT_GROUP):
+                specs[entry_point.name] = EngineSpec(entry_point.name, entry_point)
+
+        for name, engine_config in build_search_engines(current_settings, strict).items():
+            if not engine_config.get("is_enabled", False):
+                specs.pop(name, None)
+                continue
+            specs[name] = EngineSpec(
+                name,
+                engine_config.get("class") or getattr(specs.get(name), "target", None),
+                engine_config.get("config", {}),
+                engine_config.get("cost_per_query", 0.0)
+            )
+
+        return {name: spec for name, spec in specs.items() if spec.target is not None}
+
+    @property
+    def specs(self) -> Dict[str, EngineSpec]:
+        """已注册的引擎信息，首次访问时执行发现"""
+        if self._specs is None:
+            with self._lock:
+                if self._specs is None:
+                    # 首次发现时配置无效不应导致服务无法启动，忽略无效的插件引擎配置
+                    self._specs = self._discover(strict=False)
+        return self._specs
+
+    @property
+    def names(self) -> List[str]:
+        """已注册且未确认不可用的引擎名称"""
+        return [name for name in self.specs if name not in self._unavailable]
+
+    def get_spec(self, name: str) -> Optional[EngineSpec]:
+        return self.specs.get(name)
+
+    def get(self, name: str) -> Optional[BaseSearchEngine]:
+        """
+        获取引擎实例，首次使用时导入并初始化
+
+        返回:
+            引擎实例，如果未注册、导入失败或不可用则返回None
+        """
+        engine = self._engines.get(name)
+        if engine is not None:
+            return engine
+
+        with self._lock:
+            spec = self.specs.get(name)
+            if spec is None or name in self._unavailable:
+                return None
+            engine = self._engines.get(name)
+            if engine is not None:
+                return engine
+
+            try:
+                engine = spec.load_class()(spec.config)
+            except Exception as e:
+                print(f"搜索引擎 {name} 加载失败: {str(e)}")
+                self._unavailable.add(name)
+                return None
+
+            if not engine.is_available:
+                self._unavailable.add(name)
+                return None
+
+            # 重新加载期间该引擎可能已被移除或替换
+            if self.specs.get(name) is spec:
+                self._engines[name] = engine
+            return engine
+
+    @property
+    def loaded(self) -> List[str]:
+        """已导入并初始化的引擎名称"""
+        return list(self._engines.keys())
+
+    def register(self, name: str, target: Any, config: Optional[Dict[str, Any]] = None, cost_per_query: float = 0.0) -> None:
+        """
+        运行时注册或替换搜索引擎
+
+        参数:
+            name: 引擎名称
+            target: 引擎类的导入路径 "module:Class" 或引擎类
+            config: 引擎配置
+            cost_per_query: 单次调用成本
+        """
+        with self._lock:
+            specs = dict(self.specs)
+            specs[name] = EngineSpec(name, target, config, cost_per_query)
+            self._specs = specs
+            self._engines.pop(name, None)
+            self._unavailable.discard(name)
+
+    def unregister(self, name: str) -> bool:
+        """运行时移除搜索引擎，返回引擎是否存在"""
+        with self._lock:
+            if name not in self.specs:
+                return False
+            specs = dict(self.specs)
+            del specs[name]
+            self._specs = specs
+            self._engines.pop(name, None)
+            self._unavailable.discard(name)
+            return True
+
+    def reload(self) -> Dict[str, List[str]]:
+        """
+        重新发现搜索引擎，只重建配置发生变化的引擎
+
+        返回:
+            新增、移除和更新的引擎名称
+
+        异常:
+            ValueError: 插件引擎配置无效，此时保留原有引擎不变
+        """
+        with self._lock:
+            # 尚未发现过引擎时以空注册表作为原有状态，避免首次发现就读取到新配置
+            old_specs = self._specs or {}
+            new_specs = self._discover()
+
+            added = [name for name in new_specs if name not in old_specs]
+            removed = [name for name in old_specs if name not in new_specs]
+            updated = [
+                name for name in new_specs
+                if name in old_specs and not new_specs[name].same_as(old_specs[name])
+            ]
+
+            # 保留配置未变化的引擎信息，使已初始化的实例继续有效
+            for name, spec in new_specs.items():
+                if name in old_specs and name not in updated:
+                    new_specs[name] = old_specs[name]
+
+            self._specs = new_specs
+            for name in removed + updated:
+                self._engines.pop(name, None)
+            self._unavailable.clear()
+
+        return {"added": added, "removed": removed, "updated": updated}
+
+
+def _iter_entry_points(group: str) -> List[Any]:
+    """获取指定组的 entry points，兼容 Python 3.8+"""
+    from importlib import metadata
+
+    entry_points = metadata.entry_points()
+    if hasattr(entry_points, "select"):
+        return list(entry_points.select(group=group))
+    return list(entry_points.get(group, []))
+
+
+# 创建搜索引擎注册表实例
+engine_registry = EngineRegistry()
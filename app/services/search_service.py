@@ -1,7 +1,11 @@
-from typing import Dict, Any, List, Optional, Type
-from app.core.config import SEARCH_ENGINES, settings
-from app.services.search_engines import BaseSearchEngine, SearchResult, GoogleSearchEngine
+import asyncio
+import math
+import time
+from typing import Dict, Any, List, Optional, Tuple
+from app.core.config import settings
+from app.services.search_engines import BaseSearchEngine, SearchResult, engine_registry
 from app.services.cache_service import cache_service
+from app.services.routing_service import engine_router
 
 
 class SearchService:
@@ -23,40 +27,72 @@ class SearchService:
             return
             
         self._initialized = True
-        self._engines: Dict[str, BaseSearchEngine] = {}
-        self._engine_classes = {
-            "google": GoogleSearchEngine
-            # 在此处添加其他搜索引擎
-        }
-        
-        # 初始化配置的搜索引擎
-        self._load_engines()
+        # 搜索引擎由注册表在首次使用时导入和初始化
+        self._registry = engine_registry
     
-    def _load_engines(self):
-        """加载配置中启用的搜索引擎"""
-        for engine_name, engine_config in SEARCH_ENGINES.items():
-            if engine_config.get("is_enabled", False) and engine_name in self._engine_classes:
-                engine_class = self._engine_classes[engine_name]
-                engine = engine_class(engine_config.get("config", {}))
-                if engine.is_available:
-                    self._engines[engine_name] = engine
+    @property
+    def registered_engines(self) -> List[str]:
+        """获取所有已注册的搜索引擎名称，包括尚未加载或加载失败的引擎"""
+        return list(self._registry.specs.keys())
     
     @property
     def available_engines(self) -> List[str]:
-        """获取所有可用的搜索引擎名称"""
-        return list(self._engines.keys())
+        """获取所有可用的搜索引擎名称，尚未加载的引擎会在此时加载，加载失败的引擎会被跳过"""
+        return [name for name in self._registry.names if self.get_engine(name) is not None]
     
     def get_engine(self, name: str) -> Optional[BaseSearchEngine]:
         """获取指定名称的搜索引擎实例"""
-        return self._engines.get(name)
+        return self._registry.get(name)
+    
+    def reload_engines(self) -> Dict[str, List[str]]:
+        """重新加载搜索引擎配置，正在进行中的请求不受影响"""
+        return self._registry.reload()
     
-    async def search(self, query: str, engine_name: Optional[str] = None, **kwargs) -> Dict[str, List[SearchResult]]:
+    async def _search_engine(self, name: str, query: str, use_cache: bool, **kwargs) -> List[SearchResult]:
+        """
+        使用单个搜索引擎执行搜索，优先从缓存获取结果，并记录上游调用的延迟和错误
+        """
+        # 尝试从缓存获取结果
+        if use_cache:
+            cached_results = cache_service.get(query, name, **kwargs)
+            if cached_results is not None:
+                # 标记结果来自缓存
+                for result in cached_results:
+                    result.is_from_cache = True
+                return cached_results
+        
+        # 执行搜索
+        engine = self.get_engine(name)
+        if not engine:
+            raise ValueError(f"搜索引擎 '{name}' 不可用或未配置")
+        start_time = time.perf_counter()
+        try:
+            engine_results = await engine.search(query, **kwargs)
+        except Exception:
+            engine_router.record(name, time.perf_counter() - start_time, error=True)
+            raise
+        engine_router.record(name, time.perf_counter() - start_time)
+        
+        # 缓存结果
+        if use_cache:
+            cache_service.set(query, engine_results, engine=name, **kwargs)
+        
+        return engine_results
+    
+    async def search(
+        self,
+        query: str,
+        engine_name: Optional[str] = None,
+        use_cache: Optional[bool] = None,
+        **kwargs
+    ) -> Dict[str, List[SearchResult]]:
         """
         使用指定搜索引擎或所有可用引擎执行搜索
         
         参数:
             query: 搜索查询
             engine_name: 指定搜索引擎名称(可选)
+            use_cache: 是否使用缓存，如果为None则使用全局配置
             **kwargs: 传递给搜索引擎的其他参数
             
         返回:
@@ -65,59 +101,164 @@ class SearchService:
         results = {}
         
         # 检查是否启用缓存
-        use_cache = settings.CACHE_ENABLED
+        if use_cache is None:
+            use_cache = settings.CACHE_ENABLED
         
         if engine_name:
             # 使用指定的搜索引擎
-            engine = self.get_engine(engine_name)
-            if not engine:
+            if not self.get_engine(engine_name):
                 raise ValueError(f"搜索引擎 '{engine_name}' 不可用或未配置")
             
-            # 尝试从缓存获取结果
-            if use_cache:
-                cached_results = cache_service.get(query, engine_name, **kwargs)
-                if cached_results is not None:
-                    # 标记结果来自缓存
-                    for result in cached_results:
-                        result.is_from_cache = True
-                    return {engine_name: cached_results}
-            
-            # 执行搜索
-            engine_results = await engine.search(query, **kwargs)
-            results[engine_name] = engine_results
-            
-            # 缓存结果
-            if use_cache:
-                cache_service.set(query, engine_results, engine=engine_name, **kwargs)
+            results[engine_name] = await self._search_engine(engine_name, query, use_cache, **kwargs)
         else:
             # 使用所有可用的搜索引擎
-            for name, engine in self._engines.items():
+            for name in self.available_engines:
                 try:
-                    # 尝试从缓存获取结果
-                    engine_results = []
-                    if use_cache:
-                        cached_results = cache_service.get(query, name, **kwargs)
-                        if cached_results is not None:
-                            # 标记结果来自缓存
-                            for result in cached_results:
-                                result.is_from_cache = True
-                            results[name] = cached_results
-                            continue
-                    
-                    # 执行搜索
-                    engine_results = await engine.search(query, **kwargs)
-                    results[name] = engine_results
-                    
-                    # 缓存结果
-                    if use_cache:
-                        cache_service.set(query, engine_results, engine=name, **kwargs)
-                    
+                    results[name] = await self._search_engine(name, query, use_cache, **kwargs)
                 except Exception as e:
                     # 记录错误但继续处理其他引擎
                     results[name] = []
                     print(f"搜索引擎 {name} 出错: {str(e)}")
         
         return results
+    
+    async def search_routed(
+        self,
+        query: str,
+        use_cache: Optional[bool] = None,
+        **kwargs
+    ) -> Tuple[Dict[str, List[SearchResult]], List[Dict[str, Any]]]:
+        """
+        按延迟、错误率和成本选择搜索引擎执行搜索
+        先查询得分最优的引擎，仅当其返回结果过少、出错或响应过慢时才扇出到下一个引擎
+        
+        参数:
+            query: 搜索查询
+            use_cache: 是否使用缓存，如果为None则使用全局配置
+            **kwargs: 传递给搜索引擎的其他参数
+            
+        返回:
+            (搜索结果字典, 路由决策列表)
+        """
+        if use_cache is None:
+            use_cache = settings.CACHE_ENABLED
+        remaining = engine_router.rank(self.available_engines)
+        num = kwargs.get("num") or 10
+        min_results = max(1, math.ceil(num * settings.ROUTING_MIN_RESULTS_RATIO))
+        hedge_after = settings.ROUTING_HEDGE_AFTER_MS / 1000
+        
+        results: Dict[str, List[SearchResult]] = {}
+        decisions: Dict[str, Dict[str, Any]] = {}
+        pending: Dict[asyncio.Future, str] = {}
+        
+        def launch(reason: str) -> None:
+            name = remaining.pop(0)
+            task = asyncio.ensure_future(self._search_engine(name, query, use_cache, **kwargs))
+            pending[task] = name
+            decisions[name] = {
+                "engine": name,
+                "reason": reason,
+                "score": round(engine_router.get_profile(name).score, 4),
+                "started_at": time.perf_counter()
+            }
+        
+        if remaining:
+            launch("best_score")
+        
+        try:
+            while pending:
+                done, _ = await asyncio.wait(
+                    pending.keys(),
+                    timeout=hedge_after if remaining else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    # 当前引擎响应过慢，扇出到下一个引擎
+                    launch("slow")
+                    continue
+                
+                fan_out_reason = None
+                for task in done:
+                    name = pending.pop(task)
+                    decision = decisions[name]
+                    decision["latency_ms"] = round((time.perf_counter() - decision["started_at"]) * 1000, 2)
+                    try:
+                        results[name] = task.result()
+                        decision["outcome"] = "ok"
+                        decision["result_count"] = len(results[name])
+                    except Exception as e:
+                        results[name] = []
+                        decision["outcome"] = "error"
+                        decision["error"] = str(e)
+                        fan_out_reason = "error"
+                        print(f"搜索引擎 {name} 出错: {str(e)}")
+                
+                if sum(len(engine_results) for engine_results in results.values()) >= min_results:
+                    break
+                if remaining and not pending:
+                    launch(fan_out_reason or "too_few_results")
+        finally:
+            # 已获得足够结果，取消仍在进行中的引擎请求
+            for task, name in pending.items():
+                task.cancel()
+                decision = decisions[name]
+                elapsed = time.perf_counter() - decision["started_at"]
+                decision["outcome"] = "cancelled"
+                decision["latency_ms"] = round(elapsed * 1000, 2)
+                # 被取消请求的耗时是实际延迟的下界，仍计入画像以免慢引擎永远不被降级
+                engine_router.record(name, elapsed)
+        
+        for decision in decisions.values():
+            del decision["started_at"]
+        
+        return results, list(decisions.values())
+    
+    def get_stale_results(
+        self,
+        query: str,
+        engine_name: Optional[str] = None,
+        use_cache: Optional[bool] = None,
+        **kwargs
+    ) -> Optional[Tuple[Dict[str, List[SearchResult]], bool]]:
+        """
+        从缓存中获取可能已过期的搜索结果，用于过载时的降级响应
+        
+        参数:
+            query: 搜索查询
+            engine_name: 指定搜索引擎名称(可选)
+            use_cache: 是否使用缓存，如果为None则使用全局配置；不使用缓存时总是返回None
+            **kwargs: 传递给搜索引擎的其他参数
+            
+        返回:
+            (搜索结果字典, 是否包含已过期的结果)，如果没有任何可用的缓存结果则返回None
+        """
+        if use_cache is None:
+            use_cache = settings.CACHE_ENABLED
+        if not use_cache:
+            return None
+        
+        if engine_name:
+            if not self.get_engine(engine_name):
+                return None
+            engine_names = [engine_name]
+        else:
+            engine_names = self.available_engines
+        
+        results = {}
+        stale = False
+        for name in engine_names:
+            cached = cache_service.get_stale(query, name, **kwargs)
+            if cached is not None:
+                cached_results, is_stale = cached
+                # 标记结果来自缓存
+                for result in cached_results:
+                    result.is_from_cache = True
+                results[name] = cached_results
+                stale = stale or is_stale
+        
+        if not results:
+            return None
+        return results, stale
 
 
 # 创建搜索服务实例
@@ -0,0 +1,327 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.search_engines import SearchResult
+from app.services.search_service import search_service
+from app.services.cache_service import cache_service
+from app.services.admission_service import admission_controller, AdmissionRejected
+
+
+def normalize_query(query: str) -> str:
+    """规范化查询：去除首尾空白、合并连续空白并转为小写"""
+    return " ".join(query.split()).lower()
+
+
+class _TrieNode:
+    """前缀树节点"""
+
+    __slots__ = ("children", "terminal")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.terminal = False
+
+
+class TypeaheadService:
+    """
+    输入联想服务，基于最近缓存的查询构建前缀树
+    前缀树只保存查询本身，结果从缓存服务中读取；缓存未命中时才请求上游搜索引擎
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(TypeaheadService, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self._initialized = True
+        self._root = _TrieNode()
+        # 查询条目: {规范化查询: (记录时间, 原始查询, 结果数量)}，按最近使用排序
+        # 原始查询和结果数量用于定位缓存服务中该查询第一页的缓存结果
+        self._entries: "OrderedDict[str, Tuple[float, str, int]]" = OrderedDict()
+        # HTTP会话: {会话ID: TypeaheadSession}，按最近使用排序
+        self._sessions: "OrderedDict[str, TypeaheadSession]" = OrderedDict()
+        # 联想统计信息
+        self._stats = {
+            "trie_hits": 0,
+            "prefix_hits": 0,
+            "upstream": 0,
+            "superseded": 0,
+            "shed": 0
+        }
+
+    def _insert(self, query: str) -> None:
+        node = self._root
+        for char in query:
+            node = node.children.setdefault(char, _TrieNode())
+        node.terminal = True
+
+    def _remove(self, query: str) -> None:
+        path = [self._root]
+        for char in query:
+            node = path[-1].children.get(char)
+            if node is None:
+                return
+            path.append(node)
+
+        path[-1].terminal = False
+        # 自底向上清理空节点
+        for i in range(len(query), 0, -1):
+            node = path[i]
+            if node.terminal or node.children:
+                break
+            del path[i - 1].children[query[i - 1]]
+
+    def _is_fresh(self, recorded_at: float) -> bool:
+        return time.time() - recorded_at < settings.CACHE_TTL
+
+    def record(self, query: str, num: int) -> None:
+        """
+        记录已缓存的查询，供后续前缀联想使用
+        只应记录使用所有引擎、未启用智能路由的第一页搜索，结果通过缓存服务读取
+
+        参数:
+            query: 搜索查询
+            num: 搜索时请求的结果数量
+        """
+        key = normalize_query(query)
+        if not key:
+            return
+
+        if key not in self._entries:
+            self._insert(key)
+        self._entries[key] = (time.time(), query, num)
+        self._entries.move_to_end(key)
+
+        # 淘汰最久未使用的条目
+        while len(self._entries) > settings.TYPEAHEAD_MAX_ENTRIES:
+            oldest, _ = self._entries.popitem(last=False)
+            self._remove(oldest)
+
+    def _discard(self, key: str) -> None:
+        del self._entries[key]
+        self._remove(key)
+
+    def lookup(self, query: str, engine_name: Optional[str] = None) -> Optional[Dict[str, List[SearchResult]]]:
+        """
+        获取前缀树中与查询完全匹配的缓存结果
+
+        参数:
+            query: 搜索查询
+            engine_name: 指定搜索引擎名称(可选)
+
+        返回:
+            搜索结果字典，如果查询未记录或缓存已失效则返回None
+        """
+        key = normalize_query(query)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        recorded_at, raw_query, num = entry
+        if not self._is_fresh(recorded_at):
+            self._discard(key)
+            return None
+
+        engine_names = [engine_name] if engine_name else search_service.available_engines
+        results = {}
+        for name in engine_names:
+            cached_results = cache_service.peek(raw_query, name, num=num, start=1)
+            if cached_results is not None:
+                for result in cached_results:
+                    result.is_from_cache = True
+                results[name] = cached_results
+
+        if not results:
+            if not engine_name:
+                # 缓存已失效，前缀树条目随之移除
+                self._discard(key)
+            return None
+
+        self._entries.move_to_end(key)
+        return results
+
+    def complete(self, prefix: str, limit: int = 10) -> List[str]:
+        """
+        获取以指定前缀开头的已记录查询，最近使用的优先
+
+        参数:
+            prefix: 查询前缀
+            limit: 返回的最大数量
+
+        返回:
+            联想查询列表
+        """
+        node = self._root
+        for char in normalize_query(prefix):
+            node = node.children.get(char)
+            if node is None:
+                return []
+
+        matches = []
+        stack = [(node, normalize_query(prefix))]
+        while stack:
+            current, text = stack.pop()
+            if current.terminal:
+                matches.append(text)
+            for char, child in current.children.items():
+                stack.append((child, text + char))
+
+        entries = self._entries
+        matches = [
+            query for query in matches
+            if query in entries and self._is_fresh(entries[query][0])
+        ]
+        matches.sort(key=lambda query: entries[query][0], reverse=True)
+        return matches[:limit]
+
+    async def suggest(
+        self,
+        query: str,
+        engine_name: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        获取输入联想结果
+
+        参数:
+            query: 当前输入的查询(可能是不完整的前缀)
+            engine_name: 指定搜索引擎名称(可选)
+            limit: 返回的联想查询最大数量，如果为None则使用默认值
+
+        返回:
+            包含联想查询、结果和结果来源的字典
+        """
+        if limit is None:
+            limit = settings.TYPEAHEAD_SUGGESTION_LIMIT
+
+        key = normalize_query(query)
+        suggestion = {"query": query, "suggestions": [], "results": {}, "source": "none"}
+        if len(key) < settings.TYPEAHEAD_MIN_CHARS:
+            return suggestion
+
+        suggestions = self.complete(key, limit)
+        suggestion["suggestions"] = suggestions
+
+        # 优先使用前缀树中的结果：完全匹配，其次是最近的前缀补全
+        results = self.lookup(key, engine_name)
+        if results is not None:
+            suggestion["source"] = "trie"
+            self._stats["trie_hits"] += 1
+        else:
+            for candidate in suggestions:
+                results = self.lookup(candidate, engine_name)
+                if results is not None:
+                    suggestion["source"] = "prefix"
+                    self._stats["prefix_hits"] += 1
+                    break
+
+        if results is None:
+            # 前缀树未命中，请求上游搜索引擎
+            try:
+                async with admission_controller.slot():
+                    results = await search_service.search(
+                        query=query,
+                        engine_name=engine_name,
+                        num=settings.TYPEAHEAD_NUM_RESULTS,
+                        start=1
+                    )
+            except AdmissionRejected:
+                self._stats["shed"] += 1
+                return suggestion
+
+            if not engine_name:
+                self.record(query, settings.TYPEAHEAD_NUM_RESULTS)
+            suggestion["source"] = "upstream"
+            self._stats["upstream"] += 1
+
+        suggestion["results"] = {
+            name: engine_results[:settings.TYPEAHEAD_NUM_RESULTS]
+            for name, engine_results in results.items()
+        }
+        return suggestion
+
+    def get_session(self, session_id: str) -> "TypeaheadSession":
+        """获取或创建HTTP会话，超出上限时淘汰最久未使用的会话"""
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = TypeaheadSession(self)
+            self._sessions[session_id] = session
+            while len(self._sessions) > settings.TYPEAHEAD_MAX_SESSIONS:
+                _, evicted = self._sessions.popitem(last=False)
+                evicted.close()
+        self._sessions.move_to_end(session_id)
+        return session
+
+    def record_superseded(self) -> None:
+        """记录一次被后续输入取代的联想请求"""
+        self._stats["superseded"] += 1
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """获取输入联想统计信息"""
+        return {
+            "entries_count": len(self._entries),
+            "sessions_count": len(self._sessions),
+            **self._stats
+        }
+
+
+class TypeaheadSession:
+    """
+    单个客户端的联想会话
+    对输入进行防抖，新的输入会取消尚未完成的旧请求
+    """
+
+    def __init__(self, service: TypeaheadService):
+        self._service = service
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self, query: str, **kwargs) -> Dict[str, Any]:
+        await asyncio.sleep(settings.TYPEAHEAD_DEBOUNCE_MS / 1000)
+        return await self._service.suggest(query, **kwargs)
+
+    async def submit(self, query: str, **kwargs) -> Optional[Dict[str, Any]]:
+        """
+        提交新的输入
+
+        参数:
+            query: 当前输入的查询
+            **kwargs: 传递给 TypeaheadService.suggest 的其他参数
+
+        返回:
+            联想结果，如果被后续输入取代则返回None
+        """
+        self.close()
+        task = asyncio.ensure_future(self._run(query, **kwargs))
+        self._task = task
+
+        try:
+            await asyncio.wait({task})
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+
+        if task.cancelled():
+            self._service.record_superseded()
+            return None
+        return task.result()
+
+    def close(self) -> None:
+        """取消尚未完成的请求"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = None
+
+
+# 创建输入联想服务实例
+typeahead_service = TypeaheadService()
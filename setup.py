@@ -12,5 +12,6 @@ setup(
         "pydantic>=2.0.3",
         "pydantic-settings>=2.0.3",
         "python-multipart>=0.0.6",
+        "websockets>=11.0.3",
     ],
 ) 
\ No newline at end of file
@@ -0,0 +1,87 @@
+import asyncio
+import os
+
+import pytest
+
+# 测试不应访问真实的搜索引擎或写入查询日志
+os.environ["GOOGLE_API_KEY"] = ""
+os.environ["GOOGLE_CSE_ID"] = ""
+os.environ["SEARCH_ENGINE_PLUGINS"] = ""
+os.environ["SEARCH_ENGINE_CONFIG"] = ""
+os.environ["SEARCH_ENGINE_ENTRY_POINTS"] = "False"
+os.environ["QUERY_LOG_ENABLED"] = "False"
+
+from app.services.search_engines import BaseSearchEngine, SearchResult, engine_registry  # noqa: E402
+from app.services.cache_service import cache_service  # noqa: E402
+from app.services.routing_service import engine_router  # noqa: E402
+from app.services.admission_service import admission_controller  # noqa: E402
+
+
+class FakeSearchEngine(BaseSearchEngine):
+    """
+    用于测试的搜索引擎
+    通过配置控制延迟(delay)、结果数量(count)、链接前缀(prefix)和是否出错(error)
+    """
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.calls = 0
+        self.cancelled = 0
+
+    @property
+    def is_available(self) -> bool:
+        return True
+
+    async def search(self, query, **kwargs):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.config.get("delay", 0))
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+        if self.config.get("error"):
+            raise RuntimeError("engine failure")
+
+        count = self.config.get("count", kwargs.get("num", 10))
+        prefix = self.config.get("prefix", "https://example.com/")
+        return [
+            SearchResult(
+                title=f"{query} {i}",
+                link=f"{prefix}{query}/{i}",
+                snippet=f"snippet {i}",
+                source=self.config.get("name", "fake"),
+                position=i,
+                additional_info={"htmlSnippet": f"<b>{i}</b>", "displayLink": "example.com"}
+            )
+            for i in range(1, count + 1)
+        ]
+
+
+@pytest.fixture(autouse=True)
+def reset_services():
+    """重置各单例服务的运行状态"""
+    cache_service.clear()
+    engine_router._profiles.clear()
+    admission_controller._semaphore = None
+    admission_controller._active = 0
+    admission_controller._waiting = 0
+    yield
+    cache_service.clear()
+
+
+@pytest.fixture
+def register_engine():
+    """注册测试引擎，返回引擎实例；测试结束后移除"""
+    names = []
+
+    def register(name, cost_per_query=0.0, **config):
+        config["name"] = name
+        engine_registry.register(name, FakeSearchEngine, config, cost_per_query)
+        names.append(name)
+        return engine_registry.get(name)
+
+    yield register
+
+    for name in names:
+        engine_registry.unregister(name)
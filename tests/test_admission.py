@@ -0,0 +1,142 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.main import app
+from app.services.admission_service import admission_controller, AdmissionRejected
+from app.services.cache_service import cache_service
+
+
+@pytest.fixture(autouse=True)
+def single_slot(monkeypatch):
+    monkeypatch.setattr(admission_controller, "max_concurrency", 1)
+    monkeypatch.setattr(admission_controller, "max_queue", 0)
+
+
+@pytest.mark.asyncio
+async def test_queue_full_is_shed():
+    shed_before = admission_controller.stats["shed_queue_full"]
+    await admission_controller.acquire()
+    try:
+        with pytest.raises(AdmissionRejected) as exc_info:
+            await admission_controller.acquire()
+    finally:
+        admission_controller.release()
+
+    assert exc_info.value.reason == "queue_full"
+    assert exc_info.value.retry_after == settings.ADMISSION_RETRY_AFTER
+    assert admission_controller.stats["shed_queue_full"] == shed_before + 1
+
+
+@pytest.mark.asyncio
+async def test_queue_timeout_is_shed(monkeypatch):
+    monkeypatch.setattr(admission_controller, "max_queue", 1)
+    shed_before = admission_controller.stats["shed_timeout"]
+    await admission_controller.acquire()
+    try:
+        with pytest.raises(AdmissionRejected) as exc_info:
+            await admission_controller.acquire(timeout=0.05)
+    finally:
+        admission_controller.release()
+
+    assert exc_info.value.reason == "timeout"
+    assert admission_controller.stats["shed_timeout"] == shed_before + 1
+    assert admission_controller.stats["queue_depth"] == 0
+    assert admission_controller.stats["active"] == 0
+
+
+@pytest.mark.asyncio
+async def test_queued_request_is_admitted_after_release(monkeypatch):
+    monkeypatch.setattr(admission_controller, "max_queue", 1)
+    await admission_controller.acquire()
+    waiter = asyncio.ensure_future(admission_controller.acquire(timeout=1.0))
+    await asyncio.sleep(0)
+    assert admission_controller.stats["queue_depth"] == 1
+
+    admission_controller.release()
+    await waiter
+    assert admission_controller.stats["active"] == 1
+    admission_controller.release()
+
+
+@pytest.mark.asyncio
+async def test_stale_results_served_when_overloaded(register_engine, monkeypatch):
+    register_engine("fake")
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        # 缓存立即过期，但仍在保留窗口内可用于降级响应
+        monkeypatch.setattr(settings, "CACHE_TTL", -1)
+        response = await client.get("/api/search/search", params={"query": "python", "num_results": 3})
+        assert response.status_code == 200
+        assert cache_service.get("python", "fake", num=3, start=1) is None
+
+        await admission_controller.acquire()
+        try:
+            stale = await client.get("/api/search/search", params={"query": "python", "num_results": 3})
+            rejected = await client.get("/api/search/search", params={"query": "uncached", "num_results": 3})
+        finally:
+            admission_controller.release()
+
+    assert stale.status_code == 200
+    assert stale.headers["Warning"] == '110 - "Response is Stale"'
+    body = stale.json()
+    assert body["metadata"]["degraded"] is True
+    assert len(body["results"]["fake"]) == 3
+
+    assert rejected.status_code == 503
+    assert rejected.headers["Retry-After"] == str(settings.ADMISSION_RETRY_AFTER)
+
+
+def test_clear_expired_keeps_stale_entries(monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_STALE_TTL", 600)
+    cache_service.set("python", ["result"], ttl=-1, engine="fake")
+
+    assert cache_service.clear_expired() == 0
+    assert cache_service.get("python", "fake") is None
+    assert cache_service.get_stale("python", "fake") == (["result"], True)
+
+    monkeypatch.setattr(settings, "CACHE_STALE_TTL", 0)
+    assert cache_service.clear_expired() == 1
+    assert cache_service.get_stale("python", "fake") is None
+
+
+@pytest.mark.asyncio
+async def test_uncached_request_does_not_disable_cache_for_others(register_engine, monkeypatch):
+    monkeypatch.setattr(admission_controller, "max_queue", 1)
+    register_engine("fake", delay=0.05)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        uncached, cached = await asyncio.gather(
+            client.get("/api/search/search", params={"query": "python", "use_cache": "false"}),
+            client.get("/api/search/search", params={"query": "python"})
+        )
+
+    assert uncached.json()["cache_info"]["enabled"] is False
+    assert cached.json()["cache_info"]["enabled"] is True
+    assert settings.CACHE_ENABLED is True
+    assert cache_service.peek("python", "fake", num=10, start=1) is not None
+
+
+@pytest.mark.asyncio
+async def test_fresh_cache_served_when_overloaded_is_not_degraded(register_engine):
+    register_engine("fake")
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.get("/api/search/search", params={"query": "python", "num_results": 3})
+        stale_hits_before = cache_service.stats["stale_hits"]
+
+        await admission_controller.acquire()
+        try:
+            response = await client.get("/api/search/search", params={"query": "python", "num_results": 3})
+        finally:
+            admission_controller.release()
+
+    assert response.status_code == 200
+    assert "Warning" not in response.headers
+    body = response.json()
+    assert body["metadata"]["degraded"] is False
+    assert body["cache_info"]["used"] is True
+    assert body["cache_info"]["stale"] is False
+    assert cache_service.stats["stale_hits"] == stale_hits_before
@@ -0,0 +1,75 @@
+from app.services.merge_service import normalize_url, url_id, merge_results, project_fields
+from app.services.search_engines import SearchResult
+
+
+def _result(link, source, position):
+    return SearchResult(
+        title=f"{source} {position}",
+        link=link,
+        snippet="",
+        source=source,
+        position=position,
+        additional_info={"htmlSnippet": "<b>x</b>", "displayLink": "example.com"}
+    )
+
+
+def test_normalize_url_ignores_cosmetic_differences():
+    expected = normalize_url("https://example.com/page?a=1&b=2")
+    assert normalize_url("http://www.Example.com:80/page/?b=2&a=1#section") == expected
+    assert normalize_url("https://example.com:443/page?a=1&b=2&utm_source=x&gclid=y") == expected
+    assert normalize_url("https://example.com:8443/page?a=1&b=2") != expected
+    assert normalize_url("https://example.com/other?a=1&b=2") != expected
+
+
+def test_merge_results_deduplicates_and_fuses_ranks():
+    results = {
+        "first": [
+            _result("https://example.com/a", "first", 1),
+            _result("https://example.com/b", "first", 2),
+            _result("https://www.example.com/a/", "first", 3)
+        ],
+        "second": [
+            _result("https://example.com/b?utm_source=x", "second", 1),
+            _result("http://example.com/c", "second", 2)
+        ]
+    }
+
+    merged = merge_results(results, k=60)
+
+    # 使用排名最靠前的结果作为展示内容
+    assert [item["link"] for item in merged] == [
+        "https://example.com/b?utm_source=x",
+        "https://example.com/a",
+        "http://example.com/c"
+    ]
+    assert merged[0]["id"] == url_id("https://example.com/b")
+    assert merged[0]["sources"] == [
+        {"engine": "first", "position": 2},
+        {"engine": "second", "position": 1}
+    ]
+    assert merged[0]["score"] == round(1 / 62 + 1 / 61, 6)
+    # 同一引擎内的重复结果只计一次
+    assert merged[1]["sources"] == [{"engine": "first", "position": 1}]
+    assert [item["position"] for item in merged] == [1, 2, 3]
+
+
+def test_merge_results_excludes_previous_ids():
+    results = {"first": [_result("https://example.com/a", "first", 1), _result("https://example.com/b", "first", 2)]}
+
+    merged = merge_results(results, exclude_ids={url_id("https://www.example.com/a")})
+
+    assert [item["link"] for item in merged] == ["https://example.com/b"]
+
+
+def test_project_fields_include_and_exclude():
+    items = merge_results({"first": [_result("https://example.com/a", "first", 1)]})
+
+    assert project_fields(items, ["title", "additional_info.displayLink"]) == [
+        {"id": items[0]["id"], "title": "first 1", "additional_info": {"displayLink": "example.com"}}
+    ]
+
+    excluded = project_fields(items, ["-additional_info.htmlSnippet", "-snippet", "-id"])[0]
+    assert "snippet" not in excluded
+    assert excluded["id"] == items[0]["id"]
+    assert excluded["additional_info"] == {"displayLink": "example.com"}
+    assert excluded["title"] == "first 1"
@@ -0,0 +1,145 @@
+import asyncio
+import gzip
+import json
+import os
+
+import httpx
+import pytest
+
+from app.cli.replay import read_records, replay
+from app.core.config import settings
+from app.main import app
+from app.services.query_log_service import query_log_service, REPLAY_HEADER
+
+
+@pytest.fixture(autouse=True)
+def query_log(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "QUERY_LOG_ENABLED", True)
+    monkeypatch.setattr(settings, "QUERY_LOG_DIR", str(tmp_path))
+    query_log_service._queue.clear()
+    query_log_service._current_path = None
+    yield
+    query_log_service._queue.clear()
+    query_log_service._current_path = None
+
+
+def _log_files(directory):
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory))
+
+
+def test_records_are_dropped_when_queue_is_full(monkeypatch):
+    monkeypatch.setattr(settings, "QUERY_LOG_QUEUE_SIZE", 2)
+    dropped_before = query_log_service.stats["dropped"]
+
+    for i in range(3):
+        query_log_service.log({"query": f"q{i}"})
+
+    assert query_log_service.stats["queue_depth"] == 2
+    assert query_log_service.stats["dropped"] == dropped_before + 1
+
+
+@pytest.mark.asyncio
+async def test_rotates_by_size(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "QUERY_LOG_MAX_BYTES", 1)
+    rotated_before = query_log_service.stats["files_rotated"]
+
+    for i in range(2):
+        query_log_service.log({"query": f"q{i}"})
+        assert await query_log_service.flush() == 1
+
+    assert len(_log_files(tmp_path)) == 2
+    assert query_log_service.stats["files_rotated"] == rotated_before + 1
+
+
+@pytest.mark.asyncio
+async def test_rotates_by_age(tmp_path):
+    query_log_service.log({"query": "first"})
+    await query_log_service.flush()
+    query_log_service.log({"query": "second"})
+    await query_log_service.flush()
+    assert len(_log_files(tmp_path)) == 1
+
+    query_log_service._current_opened_at -= settings.QUERY_LOG_ROTATE_SECONDS
+    query_log_service.log({"query": "third"})
+    await query_log_service.flush()
+
+    assert len(_log_files(tmp_path)) == 2
+
+
+@pytest.mark.asyncio
+async def test_read_records_merges_multi_member_files(monkeypatch, tmp_path):
+    # 每批写入为一个gzip成员
+    monkeypatch.setattr(settings, "QUERY_LOG_BATCH_SIZE", 1)
+    for ts in (1.0, 3.0, 5.0):
+        query_log_service.log({"query": f"q{ts}", "status": 200, "ts": ts})
+    await query_log_service.flush()
+    logged = _log_files(tmp_path)[0]
+
+    other = tmp_path / "other.ndjson.gz"
+    with gzip.open(other, "wt", encoding="utf-8") as f:
+        for ts, status in ((2.0, 200), (4.0, 503), (6.0, 200)):
+            f.write(json.dumps({"query": f"q{ts}", "status": status, "ts": ts}) + "\n")
+
+    records = read_records([logged, str(other)])
+
+    assert not isinstance(records, list)
+    assert [record["ts"] for record in records] == [1.0, 2.0, 3.0, 5.0, 6.0]
+    assert [record["ts"] for record in read_records([logged, str(other)], only_ok=False)] == [
+        1.0, 2.0, 3.0, 4.0, 5.0, 6.0
+    ]
+
+
+@pytest.mark.asyncio
+async def test_replayed_requests_are_not_logged(register_engine):
+    register_engine("fake")
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.get("/api/search/search", params={"query": "python"})
+        assert query_log_service.stats["queue_depth"] == 1
+
+        async with httpx.AsyncClient(
+            transport=transport,
+            base_url="http://test",
+            headers={REPLAY_HEADER: "1"}
+        ) as replay_client:
+            records = ({"query": f"q{i}", "status": 200, "ts": i} for i in range(5))
+            summary = await replay(records, replay_client, speed=0, concurrency=2)
+
+    assert summary["requests"] == 5
+    assert summary["statuses"] == {"200": 5}
+    assert query_log_service.stats["queue_depth"] == 1
+
+
+
+@pytest.mark.asyncio
+async def test_replay_uses_fixed_worker_pool():
+    concurrency = 3
+    in_flight = 0
+    max_in_flight = 0
+    completed = 0
+    max_read_ahead = 0
+
+    async def handler(request):
+        nonlocal in_flight, max_in_flight, completed
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        completed += 1
+        return httpx.Response(200, json={"cache_info": {"used": False}})
+
+    def records():
+        nonlocal max_read_ahead
+        for i in range(20):
+            max_read_ahead = max(max_read_ahead, i - completed)
+            yield {"query": f"q{i}", "status": 200, "ts": i}
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://test") as client:
+        summary = await replay(records(), client, speed=0, concurrency=concurrency, limit=12)
+
+    assert summary["requests"] == 12
+    assert summary["statuses"] == {"200": 12}
+    assert summary["cache"] == {"miss": 12}
+    assert max_in_flight == concurrency
+    # 日志读取进度受工作协程和有界队列限制
+    assert max_read_ahead <= 2 * concurrency + 1
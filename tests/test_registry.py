@@ -0,0 +1,106 @@
+import httpx
+import pytest
+
+from app.main import app
+from app.services.search_engines import engine_registry
+from app.services.search_service import search_service
+
+FAKE_ENGINE = "conftest:FakeSearchEngine"
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry():
+    """每个测试从尚未发现引擎的注册表开始"""
+    engine_registry._specs = None
+    engine_registry._engines.clear()
+    engine_registry._unavailable.clear()
+    yield
+    engine_registry._specs = None
+    engine_registry._engines.clear()
+    engine_registry._unavailable.clear()
+
+
+def test_first_reload_reports_added_engines(monkeypatch):
+    monkeypatch.setenv("SEARCH_ENGINE_PLUGINS", f"plug={FAKE_ENGINE}")
+
+    changes = engine_registry.reload()
+
+    assert changes == {"added": ["plug"], "removed": [], "updated": []}
+    assert engine_registry.names == ["plug"]
+
+
+@pytest.mark.asyncio
+async def test_reload_adds_removes_and_updates_engines(monkeypatch):
+    monkeypatch.setenv("SEARCH_ENGINE_PLUGINS", f"keep={FAKE_ENGINE},change={FAKE_ENGINE},drop={FAKE_ENGINE}")
+    engine_registry.reload()
+    kept = engine_registry.get("keep")
+    replaced = engine_registry.get("change")
+    assert engine_registry.loaded == ["keep", "change"]
+
+    monkeypatch.setenv("SEARCH_ENGINE_PLUGINS", f"keep={FAKE_ENGINE},change={FAKE_ENGINE},new={FAKE_ENGINE}")
+    monkeypatch.setenv("SEARCH_ENGINE_CONFIG", '{"change": {"config": {"count": 2}, "cost_per_query": 0.01}}')
+    changes = engine_registry.reload()
+
+    assert changes == {"added": ["new"], "removed": ["drop"], "updated": ["change"]}
+    assert sorted(engine_registry.names) == ["change", "keep", "new"]
+    # 配置未变化的引擎继续使用原有实例
+    assert engine_registry.get("keep") is kept
+    updated = engine_registry.get("change")
+    assert updated is not replaced
+    assert engine_registry.get_spec("change").cost_per_query == 0.01
+    assert len(await updated.search("python")) == 2
+    # 进行中的请求持有的旧实例在替换后仍可使用
+    assert len(await replaced.search("python", num=3)) == 3
+
+
+def test_disabled_engines_are_removed(monkeypatch):
+    monkeypatch.setenv("SEARCH_ENGINE_PLUGINS", f"first={FAKE_ENGINE},second={FAKE_ENGINE}")
+    engine_registry.reload()
+
+    monkeypatch.setenv("SEARCH_ENGINES_DISABLED", "second")
+    changes = engine_registry.reload()
+
+    assert changes["removed"] == ["second"]
+    assert engine_registry.names == ["first"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("engine_config", [
+    "{not json",
+    '{"plug": {"cost_per_query": "abc"}}',
+    '{"plug": {"cost_per_query": -1}}'
+])
+async def test_invalid_config_is_rejected_on_reload(monkeypatch, engine_config):
+    monkeypatch.setenv("SEARCH_ENGINE_PLUGINS", f"plug={FAKE_ENGINE}")
+    engine_registry.reload()
+
+    monkeypatch.setenv("SEARCH_ENGINE_CONFIG", engine_config)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post("/api/search/engines/reload")
+
+    assert response.status_code == 400
+    # 保留原有引擎不变
+    assert engine_registry.names == ["plug"]
+    assert engine_registry.get_spec("plug").cost_per_query == 0.0
+
+
+def test_invalid_config_is_ignored_on_first_discovery(monkeypatch):
+    monkeypatch.setenv("SEARCH_ENGINE_PLUGINS", f"plug={FAKE_ENGINE}")
+    monkeypatch.setenv("SEARCH_ENGINE_CONFIG", '{"plug": {"cost_per_query": "abc"}}')
+
+    assert engine_registry.names == ["plug"]
+    assert engine_registry.get_spec("plug").cost_per_query == 0.0
+
+
+@pytest.mark.asyncio
+async def test_search_skips_engines_that_fail_to_load(register_engine):
+    register_engine("working")
+    engine_registry.register("missing", "tests.no_such_module:Engine")
+    try:
+        assert "missing" not in search_service.available_engines
+        results = await search_service.search("python", num=2)
+    finally:
+        engine_registry.unregister("missing")
+
+    assert list(results) == ["working"]
@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.services.search_service import search_service
+
+
+@pytest.fixture(autouse=True)
+def routing_settings(monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "ROUTING_HEDGE_AFTER_MS", 50)
+    monkeypatch.setattr(settings, "ROUTING_MIN_RESULTS_RATIO", 0.5)
+
+
+def _decisions_by_engine(decisions):
+    return {decision["engine"]: decision for decision in decisions}
+
+
+@pytest.mark.asyncio
+async def test_best_engine_answers_without_fan_out(register_engine):
+    register_engine("primary", delay=0.01)
+    secondary = register_engine("secondary", cost_per_query=0.0001, delay=0.01)
+
+    results, decisions = await search_service.search_routed("python", num=4)
+
+    assert list(results) == ["primary"]
+    assert len(results["primary"]) == 4
+    assert decisions == [
+        {"engine": "primary", "reason": "best_score", "score": 0.0,
+         "latency_ms": decisions[0]["latency_ms"], "outcome": "ok", "result_count": 4}
+    ]
+    assert secondary.calls == 0
+
+
+@pytest.mark.asyncio
+async def test_slow_engine_falls_back_and_is_cancelled(register_engine):
+    slow = register_engine("slow", delay=1.0)
+    register_engine("fast", cost_per_query=0.0001, delay=0.01)
+
+    results, decisions = await search_service.search_routed("python", num=4)
+
+    assert list(results) == ["fast"]
+    by_engine = _decisions_by_engine(decisions)
+    assert by_engine["slow"]["reason"] == "best_score"
+    assert by_engine["slow"]["outcome"] == "cancelled"
+    assert by_engine["fast"]["reason"] == "slow"
+    assert by_engine["fast"]["outcome"] == "ok"
+    # 取消在事件循环下一次调度时生效
+    await asyncio.sleep(0)
+    assert slow.cancelled == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_engine_latency_is_recorded(register_engine):
+    from app.services.routing_service import engine_router
+
+    register_engine("slow", delay=1.0)
+    register_engine("fast", cost_per_query=0.0001, delay=0.01)
+
+    await search_service.search_routed("python", num=4)
+
+    # 被取消的慢引擎也计入画像，下次路由时排在后面
+    assert engine_router.get_profile("slow").latency_p95 >= 0.05
+    assert engine_router.rank(["slow", "fast"]) == ["fast", "slow"]
+
+
+@pytest.mark.asyncio
+async def test_too_few_results_fans_out(register_engine):
+    register_engine("sparse", count=1)
+    register_engine("full", cost_per_query=0.0001)
+
+    results, decisions = await search_service.search_routed("python", num=4)
+
+    assert set(results) == {"sparse", "full"}
+    by_engine = _decisions_by_engine(decisions)
+    assert by_engine["sparse"]["result_count"] == 1
+    assert by_engine["full"]["reason"] == "too_few_results"
+
+
+@pytest.mark.asyncio
+async def test_error_fans_out(register_engine):
+    register_engine("broken", error=True)
+    register_engine("backup", cost_per_query=0.0001)
+
+    results, decisions = await search_service.search_routed("python", num=4)
+
+    assert results["broken"] == []
+    assert len(results["backup"]) == 4
+    by_engine = _decisions_by_engine(decisions)
+    assert by_engine["broken"]["outcome"] == "error"
+    assert by_engine["backup"]["reason"] == "error"
+
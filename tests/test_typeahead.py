@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.services.typeahead_service import TypeaheadSession, typeahead_service
+
+
+@pytest.fixture(autouse=True)
+def typeahead_settings(monkeypatch):
+    monkeypatch.setattr(settings, "TYPEAHEAD_DEBOUNCE_MS", 20)
+    monkeypatch.setattr(settings, "TYPEAHEAD_MIN_CHARS", 1)
+    yield
+    for key in list(typeahead_service._entries):
+        typeahead_service._discard(key)
+
+
+@pytest.mark.asyncio
+async def test_new_input_supersedes_pending_request(register_engine):
+    engine = register_engine("fake")
+    session = TypeaheadSession(typeahead_service)
+    superseded_before = typeahead_service.stats["superseded"]
+
+    first = asyncio.ensure_future(session.submit("pyt"))
+    await asyncio.sleep(0)
+    second = await session.submit("pyth")
+
+    assert await first is None
+    assert second["query"] == "pyth"
+    assert second["source"] == "upstream"
+    # 被取代的请求在防抖期间取消，不会请求上游
+    assert engine.calls == 1
+    assert typeahead_service.stats["superseded"] == superseded_before + 1
+
+
+@pytest.mark.asyncio
+async def test_new_input_cancels_in_flight_upstream_request(register_engine, monkeypatch):
+    monkeypatch.setattr(settings, "TYPEAHEAD_DEBOUNCE_MS", 0)
+    engine = register_engine("fake", delay=0.2)
+    session = TypeaheadSession(typeahead_service)
+
+    first = asyncio.ensure_future(session.submit("pyt"))
+    await asyncio.sleep(0.05)
+    assert engine.calls == 1
+
+    session.close()
+    assert await first is None
+    assert engine.cancelled == 1
+
+
+@pytest.mark.asyncio
+async def test_suggest_serves_recorded_queries_from_cache(register_engine):
+    engine = register_engine("fake")
+
+    upstream = await typeahead_service.suggest("python asyncio")
+    assert upstream["source"] == "upstream"
+
+    exact = await typeahead_service.suggest("Python  Asyncio")
+    prefix = await typeahead_service.suggest("python a")
+
+    assert exact["source"] == "trie"
+    assert prefix["source"] == "prefix"
+    assert prefix["suggestions"] == ["python asyncio"]
+    assert engine.calls == 1